@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework.authtoken",
     "phonenumber_field",
+    "core.apps.CoreConfig",
     "users.apps.UsersConfig",
     "cars.apps.CarsConfig",
     "reviews.apps.ReviewsConfig",
@@ -60,6 +61,8 @@ SOCIAL_AUTH_JSONFIELD_ENABLED = True
 AUTH_USER_MODEL = "users.User"
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.RequestInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -158,6 +161,24 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+# locmem, file или полный путь к классу бэкенда кеша
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", default="locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION",
+            default=BASE_DIR / "cache" if CACHE_BACKEND == "file" else "",
+        ),
+    }
+}
+
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
@@ -176,6 +197,10 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.MultiPartParser",
         "rest_framework.parsers.FileUploadParser",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 1000,
@@ -272,3 +297,78 @@ else:
 
 EMAIL_ADMIN = EMAIL_HOST_USER
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+##############################################################################
+#                                  JOBS                                      #
+##############################################################################
+
+# IF TRUE - TASKS RUN RIGHT AFTER COMMIT WITHOUT `manage.py runworker`
+JOBS_RUN_EAGER = bool(os.getenv("JOBS_RUN_EAGER", default="False") == "True")
+
+##############################################################################
+#                                 RENDERING                                  #
+##############################################################################
+
+# IF TRUE - CAR AND REVIEW ENDPOINTS RENDER JSON WITH ORJSON
+FAST_JSON_RENDERER = bool(
+    os.getenv("FAST_JSON_RENDERER", default="True") == "True"
+)
+
+##############################################################################
+#                              INSTRUMENTATION                               #
+##############################################################################
+
+# IF TRUE - API RESPONSES GET SERVER-TIMING HEADERS AND PER-REQUEST LOG LINES
+REQUEST_INSTRUMENTATION = bool(
+    os.getenv("REQUEST_INSTRUMENTATION", default="False") == "True"
+)
+SLOW_REQUEST_THRESHOLD_MS = float(
+    os.getenv("SLOW_REQUEST_THRESHOLD_MS", default=500)
+)
+# EMPTY - SLOW REQUESTS ARE WRITTEN TO STDERR
+SLOW_REQUEST_LOG = os.getenv("SLOW_REQUEST_LOG", default="")
+
+# IF FALSE - NO PROMETHEUS METRICS ARE COLLECTED, /metrics RETURNS 404
+PROMETHEUS_METRICS = bool(
+    os.getenv("PROMETHEUS_METRICS", default="True") == "True"
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "structured": {
+            "format": "%(asctime)s %(levelname)s %(name)s %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "structured",
+        },
+        "slow_requests": (
+            {
+                "class": "logging.handlers.WatchedFileHandler",
+                "filename": SLOW_REQUEST_LOG,
+                "formatter": "structured",
+            }
+            if SLOW_REQUEST_LOG
+            else {
+                "class": "logging.StreamHandler",
+                "formatter": "structured",
+            }
+        ),
+    },
+    "loggers": {
+        "core.requests": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "core.slow_requests": {
+            "handlers": ["slow_requests"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
@@ -5,10 +5,13 @@ from django.urls import include, path
 
 from drf_spectacular.views import SpectacularAPIView
 
+from core.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("api.v1.urls")),
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
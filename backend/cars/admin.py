@@ -1,19 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import CoordinatesCar, Car, CarVarious
-
-
-@admin.register(CoordinatesCar)
-class CoordinatesCarAdmin(admin.ModelAdmin):
-    list_display = [
-        "latitude",
-        "longitude",
-    ]
-    search_fields = [
-        "latitude",
-        "longitude",
-    ]
+from .models import Car, CarVarious, StoredImage
 
 
 @admin.register(Car)
@@ -24,6 +12,7 @@ class CarAdmin(admin.ModelAdmin):
         "model",
         "is_available",
         "type_car",
+        "rating_avg",
     ]
     search_fields = [
         "company",
@@ -55,7 +44,8 @@ class CarAdmin(admin.ModelAdmin):
                     "type_engine",
                     "power_reserve",
                     # "rating",
-                    "coordinates",
+                    "latitude",
+                    "longitude",
                 ),
             },
         ),
@@ -72,3 +62,19 @@ class CarVariousAdmin(admin.ModelAdmin):
         "latitude",
         "longitude",
     ]
+
+
+@admin.register(StoredImage)
+class StoredImageAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "ref_count",
+    ]
+    search_fields = [
+        "name",
+    ]
+    readonly_fields = [
+        "name",
+        "ref_count",
+        "variants",
+    ]
@@ -1,25 +1,44 @@
+from decimal import Decimal
+
 import django_filters
-from django.db.models import Avg, Func
+from django.db.models import Q
 
 from .models import Car, CarVarious
 
-
-class Round(Func):
-    function = "ROUND"
-    arity = 1
+HALF_STAR = Decimal("0.5")
 
 
 class RatingFilter(
     django_filters.rest_framework.BaseInFilter,
     django_filters.rest_framework.NumberFilter
 ):
+    """
+    Фильтр по округлённому среднему рейтингу машины.
+
+    Значение 4 соответствует машинам с рейтингом от 3.5 до 4.5
+    (не включительно), машины без отзывов не попадают в выборку.
+    """
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+
+        buckets = Q()
+        for rating in value:
+            buckets |= Q(
+                rating_avg__gte=rating - HALF_STAR,
+                rating_avg__lt=rating + HALF_STAR,
+            )
+        return qs.filter(buckets, rating_count__gt=0)
+
+
+class RatingRangeFilter(django_filters.rest_framework.NumberFilter):
+    """Фильтр по границе среднего рейтинга машин, имеющих отзывы."""
+
     def filter(self, qs, value):
-        if value:
-            car = Car.objects.annotate(
-                average_rating=Round(Avg('review__rating'))
-            ).filter(average_rating__in=value)
-            return car
-        return qs
+        if value is None:
+            return qs
+        return super().filter(qs.filter(rating_count__gt=0), value)
 
 
 class CarFilter(django_filters.FilterSet):
@@ -29,12 +48,14 @@ class CarFilter(django_filters.FilterSet):
     is_available = django_filters.rest_framework.BooleanFilter()
     power_reserve = django_filters.rest_framework.BaseInFilter()
     latitude = django_filters.rest_framework.RangeFilter(
-        field_name="coordinates__latitude"
+        field_name="latitude"
     )
     longitude = django_filters.rest_framework.RangeFilter(
-        field_name="coordinates__longitude"
+        field_name="longitude"
     )
     rating = RatingFilter()
+    rating_min = RatingRangeFilter(field_name="rating_avg", lookup_expr="gte")
+    rating_max = RatingRangeFilter(field_name="rating_avg", lookup_expr="lte")
     various = django_filters.filters.ModelMultipleChoiceFilter(
         field_name="various__slug",
         to_field_name="slug",
@@ -48,6 +69,8 @@ class CarFilter(django_filters.FilterSet):
             "company",
             "type_car",
             "rating",
+            "rating_min",
+            "rating_max",
             "power_reserve",
             "type_engine",
             "model",
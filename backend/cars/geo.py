@@ -0,0 +1,364 @@
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, IntegerField, Q
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Floor
+
+from core.texts import (
+    CAR_NAME_COMPANY_CHOICES,
+    CLUSTER_CACHE_TIMEOUT,
+    CLUSTER_CELLS_PER_TILE,
+    CLUSTER_PRECOMPUTED_MAX_ZOOM,
+    GRID_CELL_SIZE,
+    NEAREST_INDEX_TTL,
+)
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+HALF_EARTH_CIRCUMFERENCE_M = math.pi * EARTH_RADIUS_M
+# Сдвиг делает индексы ячеек неотрицательными, чтобы целочисленное
+# деление в SQL округляло вниз. Кратен любому множителю кластеризации.
+CLUSTER_CELL_OFFSET = 2 ** 16
+
+
+def get_grid_cell(latitude, longitude, cell_size=GRID_CELL_SIZE):
+    """Возвращает индексы ячейки сетки, в которую попадают координаты."""
+    return (
+        math.floor(latitude / cell_size),
+        math.floor(longitude / cell_size),
+    )
+
+
+def haversine(latitude1, longitude1, latitude2, longitude2):
+    """Расстояние по дуге большого круга между двумя точками, в метрах."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def filter_by_ring(queryset, cell, ring):
+    """
+    Ограничивает queryset квадратом из ячеек сетки
+    на расстоянии не более ring ячеек от центральной.
+    """
+    cell_latitude, cell_longitude = cell
+    return queryset.filter(
+        cell_latitude__range=(cell_latitude - ring, cell_latitude + ring),
+        cell_longitude__range=(cell_longitude - ring, cell_longitude + ring),
+    )
+
+
+def prefilter_nearest(queryset, latitude, longitude, limit):
+    """
+    Сужает queryset до окрестности точки, гарантированно содержащей
+    limit ближайших машин.
+
+    Окно расширяется кольцами (0, 1, 2, 4, ...) пока в него не попадёт
+    limit машин. Самая дальняя из них может лежать в углу квадрата,
+    поэтому итоговое окно расширяется до радиуса описанной окружности.
+    Если машин меньше limit, возвращается исходный queryset: это
+    проверяется заранее, чтобы не перебирать кольца до края сетки.
+    """
+    if queryset.order_by().values("pk")[:limit].count() < limit:
+        return queryset
+
+    cell = get_grid_cell(latitude, longitude)
+    max_ring = math.ceil(360 / GRID_CELL_SIZE)
+    ring = 0
+
+    while ring < max_ring:
+        in_ring = filter_by_ring(queryset, cell, ring).order_by().values("pk")
+
+        if in_ring[:limit].count() >= limit:
+            safe_ring = math.ceil(math.sqrt(2) * (ring + 1))
+            return filter_by_ring(queryset, cell, safe_ring)
+        ring = max(1, ring * 2)
+
+    return queryset
+
+
+def get_cluster_size(zoom):
+    """Сторона ячейки кластера на уровне zoom, в градусах."""
+    return 360 / 2 ** zoom / CLUSTER_CELLS_PER_TILE
+
+
+def get_cluster_cells(zoom):
+    """
+    Выражения индексов ячейки кластера на уровне zoom.
+
+    Пока кластер не мельче базовой ячейки сетки, кластеры собираются
+    из проиндексированных ячеек: множитель - степень двойки, поэтому
+    кластеры соседних уровней вкладываются друг в друга. На крупных
+    масштабах ячейка кластера вычисляется по координатам напрямую
+    и продолжает уменьшаться с ростом zoom.
+    """
+    cluster_size = get_cluster_size(zoom)
+
+    if cluster_size < GRID_CELL_SIZE:
+        return (
+            Floor(F("latitude") / cluster_size),
+            Floor(F("longitude") / cluster_size),
+        )
+
+    factor = 2 ** math.floor(math.log2(cluster_size / GRID_CELL_SIZE))
+    return tuple(
+        ExpressionWrapper(
+            (F(field) + CLUSTER_CELL_OFFSET) / factor,
+            output_field=IntegerField(),
+        )
+        for field in ("cell_latitude", "cell_longitude")
+    )
+
+
+def build_clusters(queryset, zoom):
+    """
+    Группирует машины queryset по ячейкам уровня zoom одним запросом
+    с GROUP BY. Возвращает для каждого кластера количество машин,
+    центр масс, число доступных машин и распределение по компаниям.
+    """
+    cluster_latitude, cluster_longitude = get_cluster_cells(zoom)
+    companies = [company for company, _ in CAR_NAME_COMPANY_CHOICES]
+
+    clusters = (
+        queryset.prefetch_related(None)
+        .order_by()
+        .values(
+            cluster_latitude=cluster_latitude,
+            cluster_longitude=cluster_longitude,
+        )
+        .annotate(
+            count=Count("id"),
+            center_latitude=Avg("latitude"),
+            center_longitude=Avg("longitude"),
+            available=Count("id", filter=Q(is_available=True)),
+            **{
+                f"company_{company}": Count("id", filter=Q(company=company))
+                for company in companies
+            },
+        )
+    )
+
+    return [
+        {
+            "count": cluster["count"],
+            "latitude": cluster["center_latitude"],
+            "longitude": cluster["center_longitude"],
+            "available": cluster["available"],
+            "companies": {
+                company: cluster[f"company_{company}"]
+                for company in companies
+                if cluster[f"company_{company}"]
+            },
+        }
+        for cluster in clusters
+    ]
+
+
+def cluster_cars(queryset, bbox, zoom, cache_key=None):
+    """
+    Кластеры машин из bbox на уровне zoom.
+
+    На мелких масштабах (до CLUSTER_PRECOMPUTED_MAX_ZOOM) кластеры
+    строятся сразу для всей карты и кешируются под cache_key, поэтому
+    перемещение карты не пересчитывает их: из готового набора
+    выбираются кластеры с центром внутри bbox. На крупных масштабах
+    группируются только машины из bbox, размер которого ограничен
+    при проверке запроса.
+    """
+    min_longitude, min_latitude, max_longitude, max_latitude = bbox
+
+    if zoom > CLUSTER_PRECOMPUTED_MAX_ZOOM:
+        return build_clusters(
+            queryset.filter(
+                latitude__range=(min_latitude, max_latitude),
+                longitude__range=(min_longitude, max_longitude),
+            ),
+            zoom,
+        )
+
+    key = f"cars:clusters:{zoom}:{cache_key}"
+    clusters = cache.get(key) if cache_key else None
+
+    if clusters is None:
+        clusters = build_clusters(queryset, zoom)
+
+        if cache_key:
+            cache.set(key, clusters, CLUSTER_CACHE_TIMEOUT)
+
+    return [
+        cluster
+        for cluster in clusters
+        if min_latitude <= cluster["latitude"] <= max_latitude
+        and min_longitude <= cluster["longitude"] <= max_longitude
+    ]
+
+
+class NearestCarsIndex:
+    """
+    Индекс положений машин в памяти процесса для поиска ближайших.
+
+    Машины разложены по ячейкам сетки координат. Изменения положений
+    применяются точечно через сигналы, а весь индекс перечитывается
+    из базы раз в ttl секунд, чтобы подхватить изменения,
+    сделанные другими процессами.
+    """
+
+    def __init__(self, cell_size=GRID_CELL_SIZE, ttl=NEAREST_INDEX_TTL):
+        self.cell_size = cell_size
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._cells = defaultdict(dict)
+        self._positions = {}
+        self._loaded_at = None
+
+    @property
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def load(self):
+        """Перестраивает индекс по текущим координатам машин."""
+        from .models import Car
+
+        rows = Car.objects.values_list("id", "latitude", "longitude")
+        cells = defaultdict(dict)
+        positions = {}
+
+        for car_id, latitude, longitude in rows.iterator():
+            cell = get_grid_cell(latitude, longitude, self.cell_size)
+            cells[cell][car_id] = (latitude, longitude)
+            positions[car_id] = cell
+
+        with self._lock:
+            self._cells = cells
+            self._positions = positions
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        """Загружает индекс, если он пуст или устарел."""
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl
+        ):
+            self.load()
+
+    def update(self, car_id, latitude, longitude):
+        """Перемещает машину в индексе."""
+        if not self.is_loaded:
+            return
+
+        cell = get_grid_cell(latitude, longitude, self.cell_size)
+
+        with self._lock:
+            self._discard(car_id)
+            self._cells[cell][car_id] = (latitude, longitude)
+            self._positions[car_id] = cell
+
+    def remove(self, car_id):
+        """Удаляет машину из индекса."""
+        if not self.is_loaded:
+            return
+
+        with self._lock:
+            self._discard(car_id)
+
+    def _discard(self, car_id):
+        cell = self._positions.pop(car_id, None)
+
+        if cell is not None:
+            bucket = self._cells[cell]
+            bucket.pop(car_id, None)
+
+            if not bucket:
+                del self._cells[cell]
+
+    def _candidates(self, latitude, longitude, search_radius):
+        """Машины из ячеек, покрывающих круг радиуса search_radius."""
+        delta_latitude = search_radius / METERS_PER_DEGREE
+        max_latitude = min(90.0, abs(latitude) + delta_latitude)
+        cos_latitude = math.cos(math.radians(max_latitude))
+
+        if cos_latitude * 180 * METERS_PER_DEGREE <= search_radius:
+            delta_longitude = 180.0
+        else:
+            delta_longitude = min(
+                180.0, search_radius / (METERS_PER_DEGREE * cos_latitude)
+            )
+
+        min_cell = get_grid_cell(
+            latitude - delta_latitude,
+            longitude - delta_longitude,
+            self.cell_size,
+        )
+        max_cell = get_grid_cell(
+            latitude + delta_latitude,
+            longitude + delta_longitude,
+            self.cell_size,
+        )
+        cells_in_box = (max_cell[0] - min_cell[0] + 1) * (
+            max_cell[1] - min_cell[1] + 1
+        )
+
+        crosses_antimeridian = abs(longitude) + delta_longitude > 180.0
+
+        if crosses_antimeridian or cells_in_box > len(self._cells):
+            # Окно шире заполненной части сетки или переходит через
+            # 180-й меридиан: проще обойти все заполненные ячейки.
+            for bucket in self._cells.values():
+                yield from bucket.items()
+            return
+
+        for cell_latitude in range(min_cell[0], max_cell[0] + 1):
+            for cell_longitude in range(min_cell[1], max_cell[1] + 1):
+                bucket = self._cells.get((cell_latitude, cell_longitude))
+
+                if bucket:
+                    yield from bucket.items()
+
+    def nearest(self, latitude, longitude, k, radius=None):
+        """
+        Возвращает до k ближайших машин в виде списка пар
+        (id машины, расстояние в метрах), отсортированного по расстоянию.
+
+        Радиус поиска удваивается, пока внутри него не окажется k машин,
+        поэтому результат точен для расстояния по дуге большого круга.
+        """
+        self.ensure_loaded()
+        max_radius = min(
+            radius if radius is not None else HALF_EARTH_CIRCUMFERENCE_M,
+            HALF_EARTH_CIRCUMFERENCE_M,
+        )
+        search_radius = min(self.cell_size * METERS_PER_DEGREE, max_radius)
+
+        with self._lock:
+            while True:
+                found = []
+
+                for car_id, position in self._candidates(
+                    latitude, longitude, search_radius
+                ):
+                    distance = haversine(latitude, longitude, *position)
+
+                    if distance <= search_radius:
+                        found.append((distance, car_id))
+
+                if len(found) >= k or search_radius >= max_radius:
+                    break
+
+                search_radius = min(search_radius * 2, max_radius)
+
+        found.sort()
+        return [(car_id, distance) for distance, car_id in found[:k]]
+
+
+nearest_cars_index = NearestCarsIndex()
@@ -0,0 +1,362 @@
+import csv
+import json
+import re
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Count, Max
+
+from core.texts import (
+    FIXTURES_BATCH_SIZE,
+    FIXTURES_NOT_AN_ARRAY,
+    FIXTURES_UNKNOWN_VARIOUS,
+    FIXTURES_UNSUPPORTED_MODEL,
+)
+from core.versions import bump_table_version
+
+from .geo import get_grid_cell
+from .models import Car, CarVarious, StoredImage
+
+JSON_SEPARATORS = re.compile(r"[\s,]*")
+READ_CHUNK_SIZE = 1 << 16
+TRUE_VALUES = {"true", "1", "yes"}
+CAR_ROW_FIELDS = (
+    "is_available",
+    "company",
+    "brand",
+    "model",
+    "type_car",
+    "state_number",
+    "type_engine",
+    "power_reserve",
+    "kind_car",
+)
+
+
+def read_json_array(file):
+    """
+    Записи JSON-массива по одной, без чтения всего файла в память.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_CHUNK_SIZE).lstrip()
+
+    if not buffer.startswith("["):
+        raise ValueError(FIXTURES_NOT_AN_ARRAY)
+
+    position = 1
+    eof = False
+
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+
+        if buffer.startswith("]", position):
+            return
+
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield record
+
+
+def read_ndjson(file):
+    """Записи NDJSON: по одному JSON-объекту на строку."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(file):
+    """Записи CSV с заголовком, как в выгрузке машин."""
+    yield from csv.DictReader(file)
+
+
+READERS = {
+    ".json": read_json_array,
+    ".ndjson": read_ndjson,
+    ".jsonl": read_ndjson,
+    ".csv": read_csv,
+}
+
+
+def get_row_value(row, *keys):
+    """Первое непустое значение из row по одному из ключей."""
+    for key in keys:
+        value = row.get(key)
+
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+class FleetLoader:
+    """
+    Пакетная загрузка машин через bulk_create.
+
+    Принимает записи фикстур Django ({"model", "pk", "fields"})
+    для CarVarious и Car, а также плоские строки
+    машин в формате выгрузки /api/v1/cars/export/ (NDJSON или CSV).
+    Записи других моделей вызывают ValueError.
+    Записи копятся и сохраняются пакетами по batch_size, Car.save()
+    и сигналы не вызываются: ячейки сетки считаются здесь же,
+    уменьшенные копии изображений не строятся. Идентификаторы
+    назначаются явно, поэтому связи не требуют чтения из базы.
+    Данные считаются проверенными: ограничения полей не проверяются.
+    """
+
+    def __init__(
+        self, batch_size=FIXTURES_BATCH_SIZE, ignore_conflicts=False
+    ):
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.various_ids = dict(CarVarious.objects.values_list("slug", "id"))
+        self.next_car_id = self.get_next_id(Car)
+        self.default_image = Car._meta.get_field("image").get_default()
+        self.pending = defaultdict(list)
+        self.pending_count = 0
+        self.images = Counter()
+        self.read = 0
+        self.written = 0
+
+    @staticmethod
+    def get_next_id(model):
+        return (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+
+    @property
+    def skipped(self):
+        """Записи, пропущенные из-за уже существующих ключей."""
+        return self.read - self.written
+
+    def load(self, records):
+        """Загружает записи, возвращает количество записанных."""
+        for record in records:
+            if "model" in record and "fields" in record:
+                self.add_fixture_record(record)
+            else:
+                self.add_car_row(record)
+
+            self.read += 1
+            self.pending_count += 1
+
+            if self.pending_count >= self.batch_size:
+                self.flush()
+
+        self.flush()
+        return self.written
+
+    def add_fixture_record(self, record):
+        deserialized = next(serializers.deserialize("python", [record]))
+        instance = deserialized.object
+
+        if isinstance(instance, Car):
+            self.set_grid_cell(instance)
+            self.next_car_id = max(self.next_car_id, instance.id + 1)
+            self.images[instance.image.name] += 1
+            self.add_various(
+                instance.id, deserialized.m2m_data.get("various", [])
+            )
+        elif isinstance(instance, CarVarious):
+            self.various_ids[instance.slug] = instance.id
+        else:
+            raise ValueError(
+                FIXTURES_UNSUPPORTED_MODEL.format(model=record["model"])
+            )
+
+        self.pending[type(instance)].append(instance)
+
+    def add_car_row(self, row):
+        car_id = get_row_value(row, "id")
+
+        if car_id is None:
+            car_id = self.next_car_id
+        car_id = int(car_id)
+        self.next_car_id = max(self.next_car_id, car_id + 1)
+
+        nested = row.get("coordinates")
+        nested = nested if isinstance(nested, dict) else {}
+        latitude = float(
+            get_row_value(nested, "latitude")
+            or get_row_value(row, "coordinates.latitude", "latitude")
+            or 0
+        )
+        longitude = float(
+            get_row_value(nested, "longitude")
+            or get_row_value(row, "coordinates.longitude", "longitude")
+            or 0
+        )
+
+        fields = {
+            name: row[name]
+            for name in CAR_ROW_FIELDS
+            if row.get(name) not in (None, "")
+        }
+
+        if "is_available" in fields:
+            fields["is_available"] = parse_bool(fields["is_available"])
+
+        image = self.get_image_name(row.get("image"))
+        self.images[image] += 1
+
+        car = Car(
+            id=car_id,
+            latitude=latitude,
+            longitude=longitude,
+            image=image,
+            **fields,
+        )
+        self.set_grid_cell(car)
+        self.pending[Car].append(car)
+
+        various = row.get("various") or []
+
+        if isinstance(various, str):
+            various = various.split(",")
+
+        self.add_various(
+            car_id, [self.get_various_id(slug) for slug in various]
+        )
+
+    def get_various_id(self, slug):
+        slug = slug.strip()
+
+        if slug not in self.various_ids:
+            raise ValueError(FIXTURES_UNKNOWN_VARIOUS.format(slug=slug))
+        return self.various_ids[slug]
+
+    def get_image_name(self, value):
+        """Имя файла в хранилище; ссылки из выгрузки переводятся в имена."""
+        if not value:
+            return self.default_image
+
+        path = urlparse(value).path
+
+        if path.startswith(settings.MEDIA_URL):
+            return path[len(settings.MEDIA_URL):]
+        return value
+
+    def add_various(self, car_id, various_ids):
+        through = Car.various.through
+        self.pending[through].extend(
+            through(car_id=car_id, carvarious_id=various_id)
+            for various_id in various_ids
+        )
+
+    @staticmethod
+    def set_grid_cell(car):
+        car.cell_latitude, car.cell_longitude = get_grid_cell(
+            car.latitude, car.longitude
+        )
+
+    @staticmethod
+    def get_existing(model, objects, unique_fields):
+        """Индексы объектов, совпадающих с записями базы по ключам."""
+        existing = set()
+
+        for field in unique_fields:
+            values = {getattr(obj, field) for obj in objects}
+            found = set(
+                model.objects.filter(**{f"{field}__in": values}).values_list(
+                    field, flat=True
+                )
+            )
+            existing.update(
+                index
+                for index, obj in enumerate(objects)
+                if getattr(obj, field) in found
+            )
+
+        return existing
+
+    def drop_existing(self):
+        """
+        Убирает из пакета записи, которые уже есть в базе: их
+        пропустил бы ignore_conflicts, и счётчик записанных строк
+        был бы неверным. Связи существующих машин тоже убираются,
+        иначе машине добавились бы связи из загружаемой строки.
+        """
+        various = self.pending[CarVarious]
+        existing = self.get_existing(
+            CarVarious, various, ("id", "name", "slug")
+        )
+        self.pending[CarVarious] = [
+            obj for index, obj in enumerate(various) if index not in existing
+        ]
+
+        cars = self.pending[Car]
+        existing = self.get_existing(Car, cars, ("id", "state_number"))
+        skipped_ids = {cars[index].id for index in existing}
+        self.pending[Car] = [
+            car for index, car in enumerate(cars) if index not in existing
+        ]
+        self.pending[Car.various.through] = [
+            link
+            for link in self.pending[Car.various.through]
+            if link.car_id not in skipped_ids
+        ]
+
+    def flush(self):
+        """Сохраняет накопленные записи, родительские таблицы первыми."""
+        if self.ignore_conflicts:
+            self.drop_existing()
+
+        for model in (CarVarious, Car, Car.various.through):
+            objects = self.pending.pop(model, [])
+
+            if objects:
+                model.objects.bulk_create(
+                    objects,
+                    batch_size=self.batch_size,
+                    ignore_conflicts=self.ignore_conflicts,
+                )
+
+            if model is not Car.various.through:
+                self.written += len(objects)
+
+        self.pending_count = 0
+
+    def finish(self):
+        """
+        Приводит в порядок то, что обычно делают save() и сигналы:
+        последовательности первичных ключей, счётчики ссылок
+        на изображения и версии таблиц для кеша.
+        """
+        self.flush()
+        models = [CarVarious, Car, Car.various.through]
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+        # Считаем точно, а не прибавляем: при ignore_conflicts часть
+        # строк могла не вставиться.
+        counts = (
+            Car.objects.filter(image__in=list(self.images))
+            .order_by()
+            .values_list("image")
+            .annotate(count=Count("id"))
+        )
+
+        for name, count in counts:
+            StoredImage.objects.update_or_create(
+                name=name, defaults={"ref_count": count}
+            )
+
+        self.images.clear()
+        bump_table_version(*models)
@@ -0,0 +1,169 @@
+import json
+import statistics
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from cars.filters import CarFilter
+from cars.models import Car
+
+# Центр и окно фильтров по диапазону совпадают с generate_fleet.
+CENTER_LATITUDE = 55.7558
+CENTER_LONGITUDE = 37.6173
+RANGE_DELTA = 0.01
+FILTERS = {
+    "type_car": {"type_car": "coupe"},
+    "company": {"company": "CityDrive"},
+    "type_engine": {"type_engine": "electro"},
+    "is_available": {"is_available": "false"},
+    "power_reserve": {"power_reserve": "50km"},
+    "model": {"model": "PICANTO"},
+    "available_company": {"is_available": "true", "company": "BelkaCar"},
+    "latitude": {
+        "latitude_min": CENTER_LATITUDE - RANGE_DELTA,
+        "latitude_max": CENTER_LATITUDE + RANGE_DELTA,
+    },
+    "longitude": {
+        "longitude_min": CENTER_LONGITUDE - RANGE_DELTA,
+        "longitude_max": CENTER_LONGITUDE + RANGE_DELTA,
+    },
+    "bbox": {
+        "latitude_min": CENTER_LATITUDE - RANGE_DELTA,
+        "latitude_max": CENTER_LATITUDE + RANGE_DELTA,
+        "longitude_min": CENTER_LONGITUDE - RANGE_DELTA,
+        "longitude_max": CENTER_LONGITUDE + RANGE_DELTA,
+    },
+    "rating_min": {"rating_min": "4.5"},
+}
+# Признаки поиска по индексу в плане запроса SQLite и PostgreSQL.
+INDEX_PLAN_MARKERS = ("_idx", "Index Scan", "Index Only Scan")
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет запросы страницы отфильтрованного списка машин "
+        "(COUNT(*) пагинатора и первые машины по id) при росте автопарка. "
+        "Добавленные машины удаляются откатом."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,50000",
+            help="Размеры автопарка через запятую.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Количество замеров каждого фильтра.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Размер страницы.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл JSON для сохранения результатов.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["sizes"].split(","))
+        except ValueError:
+            raise CommandError("--sizes: ожидаются числа через запятую.")
+
+        results = {}
+
+        with transaction.atomic():
+            for size in sizes:
+                self.fill_fleet(size)
+                results[size] = {
+                    name: self.measure(query, options)
+                    for name, query in FILTERS.items()
+                }
+            transaction.set_rollback(True)
+
+        self.write_table(sizes, results)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def fill_fleet(self, size):
+        missing = size - Car.objects.count()
+
+        if missing > 0:
+            call_command(
+                "generate_fleet",
+                cars=missing,
+                users=max(1, missing // 20),
+                reviews=missing,
+                seed=size,
+                stdout=StringIO(),
+            )
+
+        # Статистика для планировщика, как после autovacuum в PostgreSQL:
+        # без неё SQLite выбирает индексы наугад.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def get_queryset(self, query):
+        return CarFilter(query, queryset=Car.objects.all()).qs.order_by("id")
+
+    def time_query(self, function, repeat):
+        """Медианное время выполнения в миллисекундах."""
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return round(statistics.median(timings), 3)
+
+    def measure(self, query, options):
+        """
+        Замеряет оба запроса страницы списка: COUNT(*) пагинатора
+        и выборку первых limit машин.
+        """
+        queryset = self.get_queryset(query)
+        page = queryset.values_list("id", flat=True)[: options["limit"]]
+        count_plan = queryset.order_by().values("id").explain()
+        return {
+            "count_ms": self.time_query(
+                lambda: queryset.all().count(), options["repeat"]
+            ),
+            "page_ms": self.time_query(
+                lambda: list(page.all()), options["repeat"]
+            ),
+            "uses_index": any(
+                marker in count_plan for marker in INDEX_PLAN_MARKERS
+            ),
+        }
+
+    def write_table(self, sizes, results):
+        self.stdout.write("Медиана, мс: COUNT(*) / первая страница.")
+        self.stdout.write(
+            f"{'фильтр':<20}"
+            + "".join(f"{size:>18}" for size in sizes)
+            + "  индекс"
+        )
+
+        for name in FILTERS:
+            row = [results[size][name] for size in sizes]
+            self.stdout.write(
+                f"{name:<20}"
+                + "".join(
+                    f"{result['count_ms']:>10.2f} /{result['page_ms']:>6.2f}"
+                    for result in row
+                )
+                + f"  {'да' if row[-1]['uses_index'] else 'нет'}"
+            )
+
+        self.stdout.write(f"База данных: {connection.vendor}")
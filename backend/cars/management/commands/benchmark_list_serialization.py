@@ -0,0 +1,140 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from cars.geo import get_grid_cell
+from cars.models import Car
+from cars.serializers import CarSerializer, CarValuesSerializer
+from cars.utils import get_synthetic_state_number
+from core.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость сериализации страницы списка машин: "
+        "CarSerializer + JSONRenderer против values() + FastJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=1000,
+            help="Количество машин на странице.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Количество замеров каждого способа.",
+        )
+
+    def handle(self, *args, **options):
+        size = options["size"]
+
+        if not Car.objects.exists():
+            raise CommandError("Нет машин: загрузите фикстуры.")
+
+        # Недостающие машины создаются копированием существующих
+        # и удаляются откатом транзакции.
+        with transaction.atomic():
+            self.fill_cars(size)
+            request = RequestFactory().get(
+                "/api/v1/cars/", HTTP_HOST=self.get_host()
+            )
+            queryset = Car.objects.prefetch_related("various").order_by(
+                "id"
+            )[:size]
+            context = {"request": request}
+
+            def drf():
+                data = CarSerializer(
+                    queryset.all(), many=True, context=context
+                ).data
+                return JSONRenderer().render(data)
+
+            def fast():
+                rows = CarValuesSerializer.get_values(queryset.all())
+                data = CarValuesSerializer(
+                    rows, many=True, context=context
+                ).data
+                return FastJSONRenderer().render(data)
+
+            if drf() != fast():
+                raise CommandError("Ответы способов не совпадают.")
+
+            drf_time = self.measure(drf, options["repeat"])
+            fast_time = self.measure(fast, options["repeat"])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Машин на странице: {size}")
+        self.stdout.write(f"CarSerializer + JSONRenderer: {drf_time:.1f} мс")
+        self.stdout.write(
+            f"values() + FastJSONRenderer: {fast_time:.1f} мс"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Ускорение: {drf_time / fast_time:.1f}x")
+        )
+
+    def get_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        return hosts[0].lstrip(".") if hosts else "localhost"
+
+    def measure(self, function, repeat):
+        """Медианное время выполнения в миллисекундах."""
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return statistics.median(timings)
+
+    def fill_cars(self, size):
+        """Дополняет таблицу машин копиями до size штук."""
+        sources = list(Car.objects.all())
+        missing = size - len(sources)
+
+        if missing <= 0:
+            return
+
+        various = Car.various.through.objects.values_list(
+            "car_id", "carvarious_id"
+        )
+        various_by_car = {}
+
+        for car_id, various_id in various:
+            various_by_car.setdefault(car_id, []).append(various_id)
+
+        next_car_id = Car.objects.aggregate(Max("id"))["id__max"] + 1
+        cars, links = [], []
+
+        for index in range(missing):
+            source = sources[index % len(sources)]
+            car = Car(
+                **{
+                    field.attname: getattr(source, field.attname)
+                    for field in Car._meta.concrete_fields
+                }
+            )
+            car.id = next_car_id + index
+            car.latitude = source.latitude + index * 1e-5
+            car.cell_latitude, car.cell_longitude = get_grid_cell(
+                car.latitude, car.longitude
+            )
+            car.state_number = get_synthetic_state_number(car.id)
+            cars.append(car)
+            links.extend(
+                Car.various.through(car_id=car.id, carvarious_id=various_id)
+                for various_id in various_by_car.get(source.id, [])
+            )
+
+        Car.objects.bulk_create(cars)
+        Car.various.through.objects.bulk_create(links)
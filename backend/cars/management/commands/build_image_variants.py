@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from cars.models import Car
+from cars.tasks import process_car_image
+from core.jobs import enqueue
+from core.texts import CAR_DEFAULT_IMAGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит уменьшенные копии изображения по умолчанию и ставит "
+        "в очередь построение копий остальных изображений машин."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Перестроить копии и для машин, у которых они уже есть.",
+        )
+
+    def handle(self, *args, **options):
+        process_car_image(CAR_DEFAULT_IMAGE, rebuild=options["all"])
+        cars = Car.objects.exclude(image=CAR_DEFAULT_IMAGE)
+
+        if not options["all"]:
+            cars = cars.filter(image_variants={})
+
+        image_names = cars.order_by().values_list("image", flat=True)
+
+        for image_name in image_names.distinct():
+            enqueue(
+                "cars.tasks.process_car_image",
+                image_name=image_name,
+                rebuild=options["all"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Поставлено задач: {image_names.distinct().count()}."
+            )
+        )
@@ -0,0 +1,262 @@
+import math
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from cars.loader import FleetLoader
+from cars.models import Car, CarVarious
+from cars.utils import get_synthetic_state_number
+from core.texts import (
+    CAR_KIND_CAR_CHOICES,
+    CAR_NAME_COMPANY_CHOICES,
+    CAR_POWER_RESERVE_CHOICES,
+    CAR_TYPE_CAR_CHOICES,
+    CAR_TYPE_ENGINE_CHOICES,
+    CAR_VARIOUS_CHOICES,
+    FIXTURES_BATCH_SIZE,
+)
+from core.versions import bump_table_version
+from reviews.models import Review
+from users.models import User, UserCoordinates
+
+MODELS = {
+    "BMW": ("I5", "IX M60", "IX2", "M50", "X7"),
+    "KIA": ("CEED", "CERANTO", "K5", "PICANTO", "RIO"),
+    "LADA": ("1230", "2101", "2107", "3405", "7102"),
+}
+REVIEW_COMMENTS = (
+    "",
+    "Чистая машина.",
+    "Всё отлично.",
+    "Грязный салон.",
+    "Мало топлива.",
+)
+KM_PER_DEGREE = 111.195
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт синтетический автопарк для нагрузочных замеров: "
+        "машины с координатами и опциями, пользователей и отзывы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cars",
+            type=int,
+            default=10000,
+            help="Количество машин.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1000,
+            help="Количество пользователей с координатами.",
+        )
+        parser.add_argument(
+            "--reviews",
+            type=int,
+            default=20000,
+            help="Количество отзывов.",
+        )
+        parser.add_argument(
+            "--center",
+            default="55.7558,37.6173",
+            help="Центр города: широта,долгота.",
+        )
+        parser.add_argument(
+            "--radius-km",
+            type=float,
+            default=25.0,
+            help="Радиус города в километрах.",
+        )
+        parser.add_argument(
+            "--password",
+            default="fleet-password",
+            help="Пароль всех созданных пользователей.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Зерно генератора для воспроизводимых данных.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=FIXTURES_BATCH_SIZE,
+            help="Количество записей в одном bulk_create.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            latitude, longitude = map(float, options["center"].split(","))
+        except ValueError:
+            raise CommandError("--center: ожидается широта,долгота.")
+
+        self.random = random.Random(options["seed"])
+        self.center = (latitude, longitude)
+        self.radius_km = options["radius_km"]
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            self.ensure_various()
+            car_ids = self.create_cars(options["cars"], batch_size)
+            user_ids = self.create_users(
+                options["users"], options["password"], batch_size
+            )
+            reviews = self.create_reviews(
+                options["reviews"], car_ids, user_ids, batch_size
+            )
+
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [User, UserCoordinates, Review]
+                ):
+                    cursor.execute(sql)
+
+            if car_ids:
+                Car.objects.filter(
+                    id__range=(car_ids[0], car_ids[-1])
+                ).recalculate_rating()
+
+            bump_table_version(Review)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано машин: {len(car_ids)}, пользователей: "
+                f"{len(user_ids)}, отзывов: {reviews} "
+                f"за {time.perf_counter() - started:.1f} с."
+            )
+        )
+
+    def ensure_various(self):
+        """Создаёт справочник опций, если фикстуры не загружены."""
+        for slug, name in CAR_VARIOUS_CHOICES:
+            CarVarious.objects.get_or_create(
+                slug=slug, defaults={"name": name}
+            )
+
+    def random_point(self):
+        """
+        Случайная точка в круге вокруг центра. Плотность убывает
+        к окраинам, как у реального автопарка.
+        """
+        latitude, longitude = self.center
+        distance = abs(self.random.gauss(0, self.radius_km / 2))
+        distance = min(distance, self.radius_km)
+        angle = self.random.uniform(0, 2 * math.pi)
+        delta_latitude = distance * math.cos(angle) / KM_PER_DEGREE
+        delta_longitude = (
+            distance
+            * math.sin(angle)
+            / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+        )
+        return (
+            round(latitude + delta_latitude, 6),
+            round(longitude + delta_longitude, 6),
+        )
+
+    def get_car_rows(self, count, first_id, various):
+        choose = self.random.choice
+
+        for car_id in range(first_id, first_id + count):
+            brand = choose(list(MODELS))
+            latitude, longitude = self.random_point()
+
+            yield {
+                "id": car_id,
+                "is_available": self.random.random() < 0.7,
+                "company": choose(CAR_NAME_COMPANY_CHOICES)[0],
+                "brand": brand,
+                "model": choose(MODELS[brand]),
+                "type_car": choose(CAR_TYPE_CAR_CHOICES)[0],
+                "state_number": get_synthetic_state_number(car_id),
+                "type_engine": choose(CAR_TYPE_ENGINE_CHOICES)[0],
+                "power_reserve": choose(CAR_POWER_RESERVE_CHOICES)[0],
+                "kind_car": self.random.choices(
+                    [kind for kind, _ in CAR_KIND_CAR_CHOICES],
+                    weights=[9, 1],
+                )[0],
+                "coordinates": {"latitude": latitude, "longitude": longitude},
+                "various": self.random.sample(
+                    various, self.random.randint(0, len(various))
+                ),
+            }
+
+    def create_cars(self, count, batch_size):
+        loader = FleetLoader(batch_size)
+        first_id = loader.next_car_id
+        various = sorted(loader.various_ids)
+        loader.load(self.get_car_rows(count, first_id, various))
+        loader.finish()
+        return list(range(first_id, first_id + count))
+
+    def create_users(self, count, password, batch_size):
+        # Хеш пароля считается один раз: это самая дорогая часть.
+        password = make_password(password)
+        first_id = (User.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+        first_coordinates_id = (
+            UserCoordinates.objects.aggregate(Max("id"))["id__max"] or 0
+        ) + 1
+        coordinates, users = [], []
+
+        for index in range(count):
+            latitude, longitude = self.random_point()
+            coordinates.append(
+                UserCoordinates(
+                    id=first_coordinates_id + index,
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+            )
+            users.append(
+                User(
+                    id=first_id + index,
+                    email=f"fleet-user-{first_id + index}@example.com",
+                    first_name="Тест",
+                    last_name="Пользователь",
+                    password=password,
+                    coordinates_id=first_coordinates_id + index,
+                )
+            )
+
+        UserCoordinates.objects.bulk_create(coordinates, batch_size)
+        User.objects.bulk_create(users, batch_size)
+        return [user.id for user in users]
+
+    def create_reviews(self, count, car_ids, user_ids, batch_size):
+        """Отзывы без повторов пары пользователь-машина."""
+        if not car_ids or not user_ids:
+            return 0
+
+        count = min(count, len(car_ids) * len(user_ids))
+        pairs = set()
+
+        while len(pairs) < count:
+            pairs.add(
+                (self.random.choice(user_ids), self.random.choice(car_ids))
+            )
+
+        first_id = (Review.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+        reviews = [
+            Review(
+                id=first_id + index,
+                user_id=user_id,
+                car_id=car_id,
+                # Оценки смещены к высоким, как в реальных сервисах.
+                rating=self.random.choices(
+                    range(1, 6), weights=[1, 1, 3, 8, 12]
+                )[0],
+                comment=self.random.choice(REVIEW_COMMENTS),
+            )
+            for index, (user_id, car_id) in enumerate(sorted(pairs))
+        ]
+        Review.objects.bulk_create(reviews, batch_size)
+        return len(reviews)
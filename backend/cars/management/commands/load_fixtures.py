@@ -1,30 +1,67 @@
 import os
+import time
 
 from django.core.management.base import BaseCommand
-from django.core.management import call_command
 from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError, transaction
+
+from cars.loader import READERS, FleetLoader
+from core.texts import FIXTURES_BATCH_SIZE, FIXTURES_UNKNOWN_FORMAT
 
 
 class Command(BaseCommand):
+    help = (
+        "Потоковая загрузка машин из JSON, NDJSON и CSV пакетами "
+        "bulk_create. Без аргументов загружает фикстуры из cars/data."
+    )
     file_paths = [
         os.path.join("cars/data", "car_various.json"),
         os.path.join("cars/data", "cars.json"),
     ]
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Файлы .json, .ndjson, .jsonl или .csv.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=FIXTURES_BATCH_SIZE,
+            help="Количество записей в одном bulk_create.",
+        )
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Пропускать записи с уже существующими ключами.",
+        )
+
     def handle(self, *args, **options):
-        options["verbosity"] = 0
-        self.load_fixtures()
+        self.load_fixtures(
+            options["paths"] or self.file_paths,
+            options["batch_size"],
+            options["ignore_conflicts"],
+        )
+
+    def load_fixtures(self, paths, batch_size, ignore_conflicts):
+        for path in paths:
+            started = time.perf_counter()
 
-    def load_fixtures(self):
-        for path in self.file_paths:
             try:
-                call_command("loaddata", path, verbosity=0)
-                self.stdout.write(
-                    self.style.SUCCESS(f"Данные из {path} успешно загружены.")
-                )
+                reader = self.get_reader(path)
+
+                # Внешние ключи проверяются в конце транзакции,
+                # поэтому порядок записей внутри файла не важен.
+                with transaction.atomic():
+                    with open(path, encoding="utf-8") as file:
+                        loader = FleetLoader(batch_size, ignore_conflicts)
+                        loader.load(reader(file))
+                        loader.finish()
             except (
                 DeserializationError,
                 FileNotFoundError,
+                IntegrityError,
                 ValueError,
             ) as error:
                 self.stdout.write(
@@ -33,3 +70,26 @@ class Command(BaseCommand):
                         f"Не удалось загрузить данные из {path}."
                     )
                 )
+                continue
+
+            elapsed = time.perf_counter() - started
+            count = loader.written
+            skipped = (
+                f", пропущено существующих: {loader.skipped}"
+                if loader.skipped
+                else ""
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Данные из {path} успешно загружены: {count} записей "
+                    f"за {elapsed:.1f} с "
+                    f"({count / max(elapsed, 1e-9):.0f} записей/с){skipped}."
+                )
+            )
+
+    def get_reader(self, path):
+        _, extension = os.path.splitext(path)
+
+        if extension.lower() not in READERS:
+            raise ValueError(FIXTURES_UNKNOWN_FORMAT.format(path=path))
+        return READERS[extension.lower()]
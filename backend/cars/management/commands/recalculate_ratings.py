@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cars.models import Car
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает агрегаты рейтинга машин по отзывам."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество машин, обновляемых одним запросом.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Car.objects.recalculate_rating(
+                batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Рейтинг пересчитан для {updated} машин.")
+        )
@@ -0,0 +1,126 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from cars.models import Car, StoredImage
+from core.texts import IMAGE_SWEEP_GRACE, IMAGE_UPLOAD_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет изображения машин, на которые не ссылается ни одна машина, "
+        "вместе с их уменьшенными копиями."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Пересчитать число ссылок по машинам перед очисткой.",
+        )
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=IMAGE_SWEEP_GRACE,
+            help="Не трогать файлы моложе указанного числа секунд.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать, что будет удалено.",
+        )
+
+    def handle(self, *args, **options):
+        self.storage = Car._meta.get_field("image").storage
+        self.dry_run = options["dry_run"]
+        self.deadline = timezone.now() - timedelta(seconds=options["grace"])
+
+        if options["recount"]:
+            self.recount()
+
+        referenced = set(
+            Car.objects.order_by().values_list("image", flat=True).distinct()
+        )
+        referenced.update(
+            StoredImage.objects.filter(ref_count__gt=0).values_list(
+                "name", flat=True
+            )
+        )
+        kept_stems = {os.path.splitext(name)[0] for name in referenced}
+
+        orphans = StoredImage.objects.filter(ref_count=0).exclude(
+            name__in=referenced
+        )
+        removed_rows = 0
+
+        for image in orphans:
+            if not self.is_expired(image.name):
+                continue
+
+            if not self.dry_run:
+                image.delete()
+            removed_rows += 1
+
+        removed_files = 0
+
+        for name in self.walk(IMAGE_UPLOAD_DIR):
+            stem = os.path.splitext(name)[0]
+            original_stem = stem.rsplit("_", 1)[0]
+
+            if stem in kept_stems or original_stem in kept_stems:
+                continue
+
+            if not self.is_expired(name):
+                continue
+
+            self.stdout.write(name)
+
+            if not self.dry_run:
+                self.storage.delete(name)
+            removed_files += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено записей: {removed_rows}, файлов: {removed_files}."
+            )
+        )
+
+    def recount(self):
+        """Выставляет число ссылок по фактическому числу машин."""
+        counts = dict(
+            Car.objects.order_by()
+            .values_list("image")
+            .annotate(count=Count("id"))
+        )
+
+        if self.dry_run:
+            return
+
+        StoredImage.objects.exclude(name__in=counts).update(ref_count=0)
+
+        for name, count in counts.items():
+            StoredImage.objects.update_or_create(
+                name=name, defaults={"ref_count": count}
+            )
+
+    def is_expired(self, name):
+        """Файл отсутствует или старше периода ожидания."""
+        if not self.storage.exists(name):
+            return True
+        return self.storage.get_modified_time(name) < self.deadline
+
+    def walk(self, path):
+        """Все файлы каталога хранилища, включая вложенные."""
+        if not self.storage.exists(path):
+            return
+
+        directories, files = self.storage.listdir(path)
+
+        for file_name in files:
+            yield os.path.join(path, file_name)
+
+        for directory in directories:
+            yield from self.walk(os.path.join(path, directory))
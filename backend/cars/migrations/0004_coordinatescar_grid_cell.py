@@ -0,0 +1,45 @@
+# Generated by Django 3.2.18 on 2026-10-18 00:53
+
+import math
+
+from django.db import migrations, models
+
+GRID_CELL_SIZE = 0.01
+
+
+def fill_grid_cells(apps, schema_editor):
+    CoordinatesCar = apps.get_model('cars', 'CoordinatesCar')
+    coordinates = list(CoordinatesCar.objects.all())
+
+    for item in coordinates:
+        item.cell_latitude = math.floor(item.latitude / GRID_CELL_SIZE)
+        item.cell_longitude = math.floor(item.longitude / GRID_CELL_SIZE)
+
+    CoordinatesCar.objects.bulk_update(
+        coordinates, ['cell_latitude', 'cell_longitude'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0003_auto_20240113_1957'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coordinatescar',
+            name='cell_latitude',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Ячейка сетки по широте'),
+        ),
+        migrations.AddField(
+            model_name='coordinatescar',
+            name='cell_longitude',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Ячейка сетки по долготе'),
+        ),
+        migrations.AddIndex(
+            model_name='coordinatescar',
+            index=models.Index(fields=['cell_latitude', 'cell_longitude'], name='coordinates_car_cell_idx'),
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+    ]
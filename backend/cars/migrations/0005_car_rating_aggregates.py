@@ -0,0 +1,50 @@
+# Generated by Django 3.2.18 on 2026-10-18 00:55
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    cars = list(
+        Car.objects.annotate(
+            review_sum=Sum('review__rating'),
+            review_count=Count('review'),
+        ).filter(review_count__gt=0)
+    )
+
+    for car in cars:
+        car.rating_sum = car.review_sum
+        car.rating_count = car.review_count
+        car.rating_avg = car.review_sum / car.review_count
+
+    Car.objects.bulk_update(
+        cars, ['rating_sum', 'rating_count', 'rating_avg'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_coordinatescar_grid_cell'),
+        ('reviews', '0004_alter_review_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='rating_avg',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=3, verbose_name='Рейтинг автомобиля'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='rating_sum',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.18 on 2026-10-18 01:05
+
+import cars.storage
+import cars.utils
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_stored_images(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    StoredImage = apps.get_model('cars', 'StoredImage')
+    counts = (
+        Car.objects.order_by().values_list('image').annotate(count=Count('id'))
+    )
+    StoredImage.objects.bulk_create(
+        StoredImage(name=name, ref_count=count) for name, count in counts
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0006_car_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+                ('variants', models.JSONField(blank=True, default=dict, verbose_name='Уменьшенные копии')),
+            ],
+            options={
+                'verbose_name': 'Изображение',
+                'verbose_name_plural': 'Изображения',
+            },
+        ),
+        migrations.AlterField(
+            model_name='car',
+            name='image',
+            field=models.ImageField(default='default_image/default_car.png', help_text='Изображение автомобиля', storage=cars.storage.ContentAddressedStorage(), upload_to=cars.utils.image_upload_to),
+        ),
+        migrations.RunPython(fill_stored_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2.18 on 2026-10-18 01:27
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_state_number_duplicates(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    duplicates = list(
+        Car.objects.values('state_number')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('state_number', flat=True)[:20]
+    )
+
+    if duplicates:
+        raise RuntimeError(
+            'Повторяющиеся государственные номера: '
+            f'{", ".join(duplicates)}. Исправьте их перед миграцией.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0007_stored_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['company'], name='car_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['type_car'], name='car_type_car_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['type_engine'], name='car_type_engine_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['power_reserve'], name='car_power_reserve_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['kind_car'], name='car_kind_car_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['model'], name='car_model_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['is_available', 'company'], name='car_available_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coordinatescar',
+            index=models.Index(fields=['latitude', 'longitude'], name='coordinates_car_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coordinatescar',
+            index=models.Index(fields=['longitude'], name='coordinates_car_lon_idx'),
+        ),
+        migrations.RunPython(
+            check_state_number_duplicates, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='car',
+            constraint=models.UniqueConstraint(fields=('state_number',), name='car_state_number_unique'),
+        ),
+    ]
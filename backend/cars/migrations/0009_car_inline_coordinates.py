@@ -0,0 +1,85 @@
+# Generated by Django 3.2.18 on 2026-10-18 01:35
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_coordinates_to_cars(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    cars = list(
+        Car.objects.select_related('coordinates').only(
+            'id',
+            'coordinates__latitude',
+            'coordinates__longitude',
+            'coordinates__cell_latitude',
+            'coordinates__cell_longitude',
+        )
+    )
+
+    for car in cars:
+        coordinates = car.coordinates
+        car.latitude = coordinates.latitude
+        car.longitude = coordinates.longitude
+        car.cell_latitude = coordinates.cell_latitude
+        car.cell_longitude = coordinates.cell_longitude
+
+    Car.objects.bulk_update(
+        cars,
+        ['latitude', 'longitude', 'cell_latitude', 'cell_longitude'],
+        batch_size=1000,
+    )
+
+
+def copy_coordinates_from_cars(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    CoordinatesCar = apps.get_model('cars', 'CoordinatesCar')
+    cars = list(Car.objects.filter(coordinates__isnull=True))
+
+    for car in cars:
+        car.coordinates = CoordinatesCar.objects.create(
+            latitude=car.latitude,
+            longitude=car.longitude,
+            cell_latitude=car.cell_latitude,
+            cell_longitude=car.cell_longitude,
+        )
+
+    Car.objects.bulk_update(cars, ['coordinates'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0008_car_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='latitude',
+            field=models.FloatField(default=0.0, help_text='Допустимый диапазон: -90.0 до 90.0', validators=[django.core.validators.MaxValueValidator(limit_value=90.0), django.core.validators.MinValueValidator(limit_value=-90.0)], verbose_name='Широта'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='longitude',
+            field=models.FloatField(default=0.0, help_text='Допустимый диапазон: -180.0 до 180.0', validators=[django.core.validators.MaxValueValidator(limit_value=180.0), django.core.validators.MinValueValidator(limit_value=-180.0)], verbose_name='Долгота'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='cell_latitude',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Ячейка сетки по широте'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='cell_longitude',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Ячейка сетки по долготе'),
+        ),
+        migrations.AlterField(
+            model_name='car',
+            name='coordinates',
+            field=models.OneToOneField(help_text='Укажите координаты автомобиля', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='car_coordinates', to='cars.coordinatescar', verbose_name='Координаты автомобиля'),
+        ),
+        migrations.RunPython(
+            copy_coordinates_to_cars, copy_coordinates_from_cars
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.18 on 2026-10-18 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0009_car_inline_coordinates'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='car',
+            name='coordinates',
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['cell_latitude', 'cell_longitude'], name='car_cell_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['cell_latitude', 'cell_longitude'], name='car_available_cell_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['latitude', 'longitude'], name='car_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['longitude'], name='car_lon_idx'),
+        ),
+        migrations.DeleteModel(
+            name='CoordinatesCar',
+        ),
+    ]
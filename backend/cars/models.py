@@ -1,22 +1,30 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import (
     MaxValueValidator,
     MinValueValidator,
 )
-from django.db.models import Avg
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
 
+from core.jobs import enqueue
+from core.versions import bump_table_version
 from core.texts import (
     CAR_VARIOUS_LABEL,
     CAR_BRAND_LABEL,
+    CAR_DEFAULT_IMAGE,
+    CELL_LATITUDE_LABEL,
+    CELL_LONGITUDE_LABEL,
     CAR_COMPANY_LABEL,
-    CAR_COORDINATES_HELP_TEXT,
-    CAR_COORDINATES_LABEL,
     CAR_ENGINE_TYPE_LABEL,
     CAR_HELP_TEXT_IMAGE,
+    CAR_IMAGE_VARIANTS_LABEL,
     CAR_IS_AVAILABLE_LABEL,
     CAR_KIND_LABEL,
     CAR_MODEL_LABEL,
     CAR_POWER_RESERVE_LABEL,
+    CAR_RATING_COUNT_LABEL,
+    CAR_RATING_LABEL,
+    CAR_RATING_SUM_LABEL,
     CAR_STATE_NUMBER_LABEL,
     CAR_TYPE_LABEL,
     CAR_VERBOSE_NAME,
@@ -29,9 +37,15 @@ from core.texts import (
     CAR_TYPE_ENGINE_CHOICES,
     CAR_IS_AVAILABLE_CHOICES,
     CAR_POWER_RESERVE_CHOICES,
+    STORED_IMAGE_NAME_LABEL,
+    STORED_IMAGE_REF_COUNT_LABEL,
+    STORED_IMAGE_VARIANTS_LABEL,
+    STORED_IMAGE_VERBOSE_NAME,
+    STORED_IMAGE_VERBOSE_NAME_PLURAL,
 )
 
-from .utils import image_upload_to, resize_image
+from .storage import ContentAddressedStorage
+from .utils import image_upload_to
 from .validators import (
     validate_state_number,
 )
@@ -68,28 +82,144 @@ class Coordinates(models.Model):
         return f"Latitude: {self.latitude}, Longitude: {self.longitude}"
 
 
-class CoordinatesCar(Coordinates):
-    """Модель, представляющая координаты местоположения."""
+class CarQuerySet(models.QuerySet):
+    """Набор запросов к машинам с поддержкой агрегатов рейтинга."""
 
-    pass
+    def add_rating(self, rating_delta, count_delta):
+        """Инкрементально изменяет сумму и количество оценок машин."""
+        self.update(
+            rating_sum=F("rating_sum") + rating_delta,
+            rating_count=F("rating_count") + count_delta,
+        )
+        return self.update(
+            rating_avg=Case(
+                When(rating_count=0, then=Value(0.0)),
+                default=(
+                    Cast("rating_sum", output_field=FloatField())
+                    / F("rating_count")
+                ),
+                output_field=FloatField(),
+            )
+        )
 
+    def recalculate_rating(self, batch_size=1000):
+        """Полностью пересчитывает агрегаты рейтинга по отзывам."""
+        cars = self.annotate(
+            review_sum=Coalesce(
+                Sum("review__rating"),
+                Value(0),
+                output_field=models.DecimalField(),
+            ),
+            review_count=Count("review"),
+        ).only("id")
+        batch = []
+        updated = 0
 
-class Car(models.Model):
-    """Модель, представляющая информацию о автомобиле."""
+        for car in cars.iterator(chunk_size=batch_size):
+            car.rating_sum = car.review_sum
+            car.rating_count = car.review_count
+            car.rating_avg = (
+                car.review_sum / car.review_count if car.review_count else 0
+            )
+            batch.append(car)
 
-    coordinates = models.OneToOneField(
-        CoordinatesCar,
-        verbose_name=CAR_COORDINATES_LABEL,
-        help_text=CAR_COORDINATES_HELP_TEXT,
-        on_delete=models.CASCADE,
-        related_name="car_coordinates",
+            if len(batch) >= batch_size:
+                updated += self._update_rating_batch(batch)
+                batch = []
+
+        return updated + self._update_rating_batch(batch)
+
+    def _update_rating_batch(self, batch):
+        self.model.objects.bulk_update(
+            batch, ["rating_sum", "rating_count", "rating_avg"]
+        )
+        bump_table_version(self.model)
+        return len(batch)
+
+
+class StoredImageQuerySet(models.QuerySet):
+    """Набор запросов к изображениям со счётчиком ссылок."""
+
+    def acquire(self, name):
+        """
+        Добавляет ссылку на изображение.
+        Возвращает уже построенные уменьшенные копии или пустой словарь.
+        """
+        image, _ = self.get_or_create(name=name)
+        self.filter(pk=image.pk).update(ref_count=F("ref_count") + 1)
+        return image.variants
+
+    def release(self, name):
+        """Убирает ссылку на изображение."""
+        return self.filter(name=name, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1
+        )
+
+
+class StoredImage(models.Model):
+    """
+    Файл изображения машины и число машин, которые на него ссылаются.
+
+    Уменьшенные копии строятся один раз на файл, а не на машину.
+    Файлы без ссылок удаляет команда sweep_images.
+    """
+
+    name = models.CharField(
+        STORED_IMAGE_NAME_LABEL,
+        max_length=255,
+        unique=True,
+    )
+    ref_count = models.PositiveIntegerField(
+        STORED_IMAGE_REF_COUNT_LABEL,
+        default=0,
+    )
+    variants = models.JSONField(
+        STORED_IMAGE_VARIANTS_LABEL,
+        default=dict,
+        blank=True,
+    )
+
+    objects = StoredImageQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = STORED_IMAGE_VERBOSE_NAME
+        verbose_name_plural = STORED_IMAGE_VERBOSE_NAME_PLURAL
+
+    def __str__(self):
+        return self.name
+
+
+class Car(Coordinates):
+    """
+    Модель, представляющая информацию о автомобиле.
+
+    Координаты хранятся в самой машине, поэтому чтение, сортировка
+    по расстоянию и обновление положения затрагивают одну таблицу.
+    """
+
+    cell_latitude = models.IntegerField(
+        CELL_LATITUDE_LABEL,
+        default=0,
+        editable=False,
+    )
+    cell_longitude = models.IntegerField(
+        CELL_LONGITUDE_LABEL,
+        default=0,
+        editable=False,
     )
     image = models.ImageField(
         upload_to=image_upload_to,
+        storage=ContentAddressedStorage(),
         blank=False,
-        default="default_image/default_car.png",
+        default=CAR_DEFAULT_IMAGE,
         help_text=CAR_HELP_TEXT_IMAGE,
     )
+    image_variants = models.JSONField(
+        CAR_IMAGE_VARIANTS_LABEL,
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     is_available = models.BooleanField(
         CAR_IS_AVAILABLE_LABEL,
         default=True,
@@ -138,23 +268,145 @@ class Car(models.Model):
         choices=CAR_KIND_CAR_CHOICES,
         max_length=9,
     )
+    rating_sum = models.DecimalField(
+        CAR_RATING_SUM_LABEL,
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        CAR_RATING_COUNT_LABEL,
+        default=0,
+        editable=False,
+    )
+    rating_avg = models.DecimalField(
+        CAR_RATING_LABEL,
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        db_index=True,
+    )
+
+    objects = CarQuerySet.as_manager()
 
     class Meta:
         verbose_name = CAR_VERBOSE_NAME
         verbose_name_plural = CAR_VERBOSE_NAME_PLURAL
+        indexes = [
+            models.Index(fields=["company"], name="car_company_idx"),
+            models.Index(fields=["type_car"], name="car_type_car_idx"),
+            models.Index(fields=["type_engine"], name="car_type_engine_idx"),
+            models.Index(
+                fields=["power_reserve"], name="car_power_reserve_idx"
+            ),
+            models.Index(fields=["kind_car"], name="car_kind_car_idx"),
+            models.Index(fields=["model"], name="car_model_idx"),
+            # Доступные машины выбранных компаний - самый частый
+            # запрос приложения; первый столбец обслуживает
+            # и фильтр is_available отдельно.
+            models.Index(
+                fields=["is_available", "company"],
+                name="car_available_company_idx",
+            ),
+            models.Index(
+                fields=["cell_latitude", "cell_longitude"],
+                name="car_cell_idx",
+            ),
+            # Частичный индекс по доступным машинам для карты
+            # и поиска ближайших свободных машин.
+            models.Index(
+                fields=["cell_latitude", "cell_longitude"],
+                name="car_available_cell_idx",
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=["latitude", "longitude"],
+                name="car_lat_lon_idx",
+            ),
+            models.Index(fields=["longitude"], name="car_lon_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["state_number"], name="car_state_number_unique"
+            ),
+        ]
 
     def __str__(self):
         return f"[{self.company}]: {self.brand} {self.model}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        image = instance.__dict__.get("image")
+        instance._loaded_image = getattr(image, "name", image)
+        return instance
+
+    def image_has_changed(self, update_fields=None):
+        """Изменилось ли изображение с момента загрузки из базы."""
+        if not self.image:
+            return False
+
+        if update_fields is not None and "image" not in update_fields:
+            return False
+
+        if not getattr(self.image, "_committed", True):
+            return True
+
+        return self.image.name != getattr(self, "_loaded_image", None)
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        """
+        Сохраняет машину. Уменьшенные копии изображения строятся
+        фоновой задачей и только если изображение изменилось,
+        поэтому обновление координат и доступности не трогает файлы.
+        Если копии этого файла уже построены для другой машины,
+        они используются повторно. Копии изображения по умолчанию
+        строит один раз команда build_image_variants, задача для него
+        не ставится.
+        """
+        update_fields = kwargs.get("update_fields")
+
+        # Ячейка сетки вычисляется в обработчике pre_save и должна
+        # сохраняться вместе с координатами.
+        if update_fields is not None and {"latitude", "longitude"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = set(update_fields) | {
+                "cell_latitude",
+                "cell_longitude",
+            }
+
+        image_changed = self.image_has_changed(update_fields)
+
+        if not image_changed:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            self.image_variants = {}
+            super().save(*args, **kwargs)
+            # Имя файла известно только после сохранения поля.
+            variants = StoredImage.objects.acquire(self.image.name)
+
+            previous_image = getattr(self, "_loaded_image", None)
+
+            if previous_image:
+                StoredImage.objects.release(previous_image)
+
+            if variants:
+                self.image_variants = variants
+                Car.objects.filter(pk=self.pk).update(image_variants=variants)
+            elif self.image.name != CAR_DEFAULT_IMAGE:
+                enqueue(
+                    "cars.tasks.process_car_image",
+                    image_name=self.image.name,
+                )
 
-        if self.image:
-            resize_image(self.image.path)
+        self._loaded_image = self.image.name
 
     def get_rating(self):
-        rating_avg = self.review.all().aggregate(Avg("rating"))
-        return rating_avg["rating__avg"] or 0
+        return self.rating_avg if self.rating_count else 0
 
 
 class CarVarious(models.Model):
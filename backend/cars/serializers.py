@@ -1,37 +1,78 @@
-from django.db.models import Avg
+from collections import defaultdict
 
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
-from .validators import state_number_validate
-from .models import Car, CoordinatesCar, CarVarious
+from core.serializers import SparseFieldsMixin, ValuesSerializer
+from core.texts import (
+    CLUSTER_BBOX_FORMAT,
+    CLUSTER_BBOX_HELP_TEXT,
+    CLUSTER_BBOX_NOT_NUMBERS,
+    CLUSTER_BBOX_OUT_OF_RANGE,
+    CLUSTER_BBOX_TOO_LARGE,
+    CLUSTER_MAX_BBOX_TILES,
+    CLUSTER_MAX_ZOOM,
+    CLUSTER_PRECOMPUTED_MAX_ZOOM,
+    NEAREST_DEFAULT_K,
+    NEAREST_MAX_K,
+)
 
-from reviews.models import Review
+from .validators import unique_state_number
+from .models import Car, CarVarious
+
+
+def get_media_url(name, request=None, storage=default_storage):
+    """Ссылка на файл, абсолютная, если известен запрос."""
+    url = storage.url(name)
+
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def get_image_urls(variants, request=None):
+    """
+    Ссылки на уменьшенные копии изображения для srcset:
+    {"marker": {"webp": url, "fallback": url}, ...}.
+    """
+    return {
+        variant: {
+            image_format: get_media_url(name, request)
+            for image_format, name in names.items()
+        }
+        for variant, names in variants.items()
+    }
 
 
 class CoordinatesCarSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели CoordinatesCar."""
+    """
+    Координаты автомобиля. Поля хранятся в самой модели Car
+    и отдаются вложенным объектом для совместимости API.
+    """
 
     class Meta:
-        model = CoordinatesCar
+        model = Car
         fields = ("latitude", "longitude")
 
 
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Car."""
 
-    coordinates = CoordinatesCarSerializer()
+    coordinates = CoordinatesCarSerializer(source="*")
     various = serializers.SlugRelatedField(
         many=True,
         slug_field="slug",
         queryset=CarVarious.objects.all(),
     )
     rating = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Car
         fields = [
             "id",
             "image",
+            "images",
             "coordinates",
             "is_available",
             "model",
@@ -46,63 +87,183 @@ class CarSerializer(serializers.ModelSerializer):
             "kind_car",
         ]
 
-    def create_or_update_coordinates(self, instance, coordinates_data):
-        """Создает или обновляет координаты автомобиля."""
-        if instance:
-            coordinates_serializer = CoordinatesCarSerializer(
-                instance.coordinates,
-                data=coordinates_data,
-                partial=True,
-            )
-        else:
-            coordinates_serializer = CoordinatesCarSerializer(
-                data=coordinates_data,
-                partial=True,
-            )
-        coordinates_serializer.is_valid(raise_exception=True)
-        return coordinates_serializer.save()
-
     def create(self, validated_data):
         """Создает новый объект Car с указанными данными."""
         various_values = validated_data.pop("various", [])
-        coordinates_data = validated_data.pop("coordinates", {})
-
-        coordinates_instance = self.create_or_update_coordinates(
-            None,
-            coordinates_data,
-        )
-
-        validated_data["coordinates"] = coordinates_instance
-        state_number_validate(validated_data["state_number"])
 
-        car = Car.objects.create(**validated_data)
+        with unique_state_number():
+            car = Car.objects.create(**validated_data)
         car.various.set(various_values)
 
         return car
 
     def update(self, instance, validated_data):
         """Обновляет существующий объект Car с указанными данными."""
-        coordinates_data = validated_data.pop("coordinates", {})
-
-        coordinates_instance = self.create_or_update_coordinates(
-            instance, coordinates_data
-        )
-        validated_data["coordinates"] = coordinates_instance
-
-        state_number = validated_data.get("state_number")
-
-        if state_number:
-            state_number_validate(state_number, instance)
-
-        return super().update(instance, validated_data)
+        with unique_state_number():
+            return super().update(instance, validated_data)
 
     def to_representation(self, instance):
         """Преобразует объект Car в представление для API."""
         data = super().to_representation(instance)
-        data["rating"] = str(round(data["rating"], 2))
+
+        if "rating" in data:
+            data["rating"] = str(round(data["rating"], 2))
 
         return data
 
     def get_rating(self, obj):
         """Расчёт среднего значения рейтинга для машин."""
         return obj.get_rating()
+
+    def get_images(self, obj):
+        """
+        Ссылки на уменьшенные копии изображения.
+        Пока копии не построены, возвращается пустой словарь.
+        """
+        return get_image_urls(obj.image_variants, self.context.get("request"))
+
+
+class CarValuesSerializer(ValuesSerializer):
+    """
+    Быстрая сериализация списка машин из values().
+    Ответ совпадает с CarSerializer.
+    """
+
+    values = {
+        "id": ("id",),
+        "image": ("image",),
+        "images": ("image_variants",),
+        "coordinates": ("latitude", "longitude"),
+        "is_available": ("is_available",),
+        "model": ("model",),
+        "company": ("company",),
+        "brand": ("brand",),
+        "type_car": ("type_car",),
+        "state_number": ("state_number",),
+        "type_engine": ("type_engine",),
+        "rating": ("rating_avg", "rating_count"),
+        "various": (),
+        "power_reserve": ("power_reserve",),
+        "kind_car": ("kind_car",),
+    }
+    csv_expanded = {"coordinates": ("latitude", "longitude")}
+
+    def prepare(self, rows):
+        """Слаги разного для всех машин страницы одним запросом."""
+        self.request = self.context.get("request")
+        self.image_storage = Car._meta.get_field("image").storage
+        self.various = defaultdict(list)
+
+        if "various" in self.fields:
+            links = (
+                Car.various.through.objects.filter(
+                    car_id__in=[row["id"] for row in rows]
+                )
+                .order_by("carvarious__name")
+                .values_list("car_id", "carvarious__slug")
+            )
+
+            for car_id, slug in links:
+                self.various[car_id].append(slug)
+
+        return rows
+
+    def get_image(self, row):
+        if not row["image"]:
+            return None
+        return get_media_url(row["image"], self.request, self.image_storage)
+
+    def get_images(self, row):
+        return get_image_urls(row["image_variants"], self.request)
+
+    def get_coordinates(self, row):
+        return {
+            "latitude": row["latitude"],
+            "longitude": row["longitude"],
+        }
+
+    def get_rating(self, row):
+        rating = row["rating_avg"] if row["rating_count"] else 0
+        return str(round(rating, 2))
+
+    def get_various(self, row):
+        return self.various[row["id"]]
+
+
+class NearestCarsQuerySerializer(serializers.Serializer):
+    """Параметры поиска ближайших машин."""
+
+    lat = serializers.FloatField(min_value=-90.0, max_value=90.0)
+    lon = serializers.FloatField(min_value=-180.0, max_value=180.0)
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=NEAREST_MAX_K,
+        default=NEAREST_DEFAULT_K,
+    )
+    radius_km = serializers.FloatField(min_value=0.0, required=False)
+
+
+class ClusterQuerySerializer(serializers.Serializer):
+    """Параметры кластеризации машин на карте."""
+
+    bbox = serializers.CharField(
+        help_text=CLUSTER_BBOX_HELP_TEXT,
+    )
+    zoom = serializers.IntegerField(min_value=0, max_value=CLUSTER_MAX_ZOOM)
+
+    def validate_bbox(self, value):
+        try:
+            bbox = [float(part) for part in value.split(",")]
+        except ValueError:
+            raise serializers.ValidationError(CLUSTER_BBOX_NOT_NUMBERS)
+
+        if len(bbox) != 4:
+            raise serializers.ValidationError(CLUSTER_BBOX_FORMAT)
+
+        min_longitude, min_latitude, max_longitude, max_latitude = bbox
+
+        if not (
+            -180.0 <= min_longitude <= max_longitude <= 180.0
+            and -90.0 <= min_latitude <= max_latitude <= 90.0
+        ):
+            raise serializers.ValidationError(CLUSTER_BBOX_OUT_OF_RANGE)
+
+        return bbox
+
+    def validate(self, attrs):
+        """
+        На крупных масштабах ограничивает размер области, чтобы
+        группировка не обходила все машины большого региона.
+        """
+        zoom = attrs["zoom"]
+
+        if zoom <= CLUSTER_PRECOMPUTED_MAX_ZOOM:
+            return attrs
+
+        min_longitude, min_latitude, max_longitude, max_latitude = attrs[
+            "bbox"
+        ]
+        max_size = CLUSTER_MAX_BBOX_TILES * 360 / 2 ** zoom
+
+        if (
+            max_longitude - min_longitude > max_size
+            or max_latitude - min_latitude > max_size
+        ):
+            raise serializers.ValidationError(
+                {
+                    "bbox": CLUSTER_BBOX_TOO_LARGE.format(
+                        zoom=zoom, max_size=max_size
+                    )
+                }
+            )
+
+        return attrs
+
+
+class TelemetryRowSerializer(serializers.Serializer):
+    """Одна запись телеметрии: положение и доступность машины."""
+
+    id = serializers.IntegerField(min_value=1)
+    lat = serializers.FloatField(min_value=-90.0, max_value=90.0)
+    lon = serializers.FloatField(min_value=-180.0, max_value=180.0)
+    is_available = serializers.BooleanField(required=False)
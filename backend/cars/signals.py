@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.versions import track_table_versions
+
+from .geo import get_grid_cell, nearest_cars_index
+from .models import Car, CarVarious, StoredImage
+from .tiles import invalidate_tiles
+
+
+@receiver(pre_save, sender=Car)
+def update_grid_cell(sender, instance, **kwargs):
+    """Пересчитывает ячейку сетки при изменении координат машины."""
+    instance.cell_latitude, instance.cell_longitude = get_grid_cell(
+        instance.latitude, instance.longitude
+    )
+
+
+@receiver(post_save, sender=Car)
+def add_car_to_nearest_index(sender, instance, raw=False, **kwargs):
+    """
+    Добавляет или перемещает машину в индексе ближайших машин
+    после фиксации транзакции, чтобы откат не оставил в индексе
+    несохранённое положение.
+    """
+    if raw or not nearest_cars_index.is_loaded:
+        return
+
+    position = (instance.id, instance.latitude, instance.longitude)
+    transaction.on_commit(lambda: nearest_cars_index.update(*position))
+
+
+@receiver(post_delete, sender=Car)
+def remove_car_from_nearest_index(sender, instance, **kwargs):
+    """Удаляет машину из индекса ближайших машин после фиксации."""
+    car_id = instance.id
+    transaction.on_commit(lambda: nearest_cars_index.remove(car_id))
+
+
+@receiver(post_delete, sender=Car)
+def release_car_image(sender, instance, **kwargs):
+    """Убирает ссылку удалённой машины на файл изображения."""
+    if instance.image:
+        StoredImage.objects.release(instance.image.name)
+
+
+@receiver(post_init, sender=Car)
+def remember_tile_position(sender, instance, **kwargs):
+    """Запоминает исходное положение, чтобы сбросить его тайлы."""
+    instance._tile_position = (
+        instance.__dict__.get("latitude"),
+        instance.__dict__.get("longitude"),
+    )
+
+
+@receiver(post_save, sender=Car)
+def invalidate_moved_car_tiles(sender, instance, raw=False, **kwargs):
+    """Сбрасывает тайлы старого и нового положения машины."""
+    if raw:
+        return
+
+    position = (instance.latitude, instance.longitude)
+    previous = getattr(instance, "_tile_position", (None, None))
+    positions = [position]
+
+    if None not in previous and previous != position:
+        positions.append(previous)
+
+    transaction.on_commit(lambda: invalidate_tiles(*positions))
+    instance._tile_position = position
+
+
+@receiver(post_delete, sender=Car)
+def invalidate_car_tiles(sender, instance, **kwargs):
+    """Сбрасывает тайлы, в которых отображалась машина."""
+    position = (instance.latitude, instance.longitude)
+    transaction.on_commit(lambda: invalidate_tiles(position))
+
+
+track_table_versions(Car, CarVarious, Car.various.through)
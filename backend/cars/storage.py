@@ -0,0 +1,18 @@
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище для путей, построенных по хешу содержимого.
+
+    Одинаковое имя означает одинаковое содержимое, поэтому существующий
+    файл не перезаписывается и новое имя с суффиксом не подбирается.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
@@ -0,0 +1,36 @@
+from core.metrics import IMAGE_PROCESSING_DURATION, observe_duration
+from core.texts import CAR_DEFAULT_IMAGE, CAR_DEFAULT_IMAGE_VARIANTS_DIR
+from core.versions import bump_table_version
+
+from .models import Car, StoredImage
+from .utils import make_image_variants
+
+
+def process_car_image(image_name, rebuild=False):
+    """
+    Задача очереди: построение уменьшенных копий изображения
+    для всех машин, которые его используют.
+
+    Копии строятся один раз на файл; повторная задача для того же
+    файла только раздаёт готовые копии машинам. Копии изображения
+    по умолчанию сохраняются в отдельный каталог, чтобы не менять
+    каталог с оригиналом из репозитория.
+    """
+    image, _ = StoredImage.objects.get_or_create(name=image_name)
+    directory = (
+        CAR_DEFAULT_IMAGE_VARIANTS_DIR
+        if image_name == CAR_DEFAULT_IMAGE
+        else None
+    )
+
+    if rebuild or not image.variants:
+        with observe_duration(IMAGE_PROCESSING_DURATION):
+            image.variants = make_image_variants(
+                image_name, directory=directory
+            )
+        image.save(update_fields=["variants"])
+
+    if Car.objects.filter(image=image_name).update(
+        image_variants=image.variants
+    ):
+        bump_table_version(Car)
@@ -0,0 +1,127 @@
+from django.db import transaction
+from rest_framework import serializers
+
+from core.texts import TELEMETRY_BATCH_SIZE, TELEMETRY_CAR_NOT_FOUND
+from core.versions import bump_table_version
+
+from .geo import get_grid_cell, nearest_cars_index
+from .models import Car
+from .serializers import TelemetryRowSerializer
+from .tiles import invalidate_tiles
+
+
+def validate_telemetry(rows):
+    """
+    Проверяет записи телеметрии по отдельности.
+
+    Возвращает пары (индекс, запись) для корректных записей
+    и список ошибок с индексом исходной записи.
+    """
+    row_serializer = TelemetryRowSerializer()
+    valid, failed = [], []
+
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, row_serializer.run_validation(row)))
+        except serializers.ValidationError as error:
+            failed.append({"index": index, "errors": error.detail})
+
+    return valid, failed
+
+
+def apply_telemetry(rows, batch_size=TELEMETRY_BATCH_SIZE):
+    """
+    Применяет пакет телеметрии одной транзакцией.
+
+    Машины читаются одним запросом с блокировкой строк и обновляются
+    bulk_update по таблице машин, без Car.save() и сигналов. Поэтому
+    версия таблицы машин, индекс ближайших машин и версии тайлов
+    старых и новых положений машин обновляются здесь же. Доступность
+    записывается только машинам, для которых она передана.
+    """
+    valid, failed = validate_telemetry(rows)
+    position_fields = [
+        "latitude",
+        "longitude",
+        "cell_latitude",
+        "cell_longitude",
+    ]
+    moved_positions = set()
+    changed_cars = {}
+    availability_ids = set()
+
+    with transaction.atomic():
+        cars = (
+            Car.objects.select_for_update()
+            .only("id", "is_available", "latitude", "longitude")
+            .order_by("id")
+            .in_bulk({row["id"] for _, row in valid})
+        )
+
+        for index, row in valid:
+            car = cars.get(row["id"])
+
+            if car is None:
+                failed.append(
+                    {
+                        "index": index,
+                        "id": row["id"],
+                        "errors": TELEMETRY_CAR_NOT_FOUND,
+                    }
+                )
+                continue
+
+            moved_positions.add((car.latitude, car.longitude))
+            car.latitude = row["lat"]
+            car.longitude = row["lon"]
+            car.cell_latitude, car.cell_longitude = get_grid_cell(
+                row["lat"], row["lon"]
+            )
+
+            if "is_available" in row:
+                car.is_available = row["is_available"]
+                availability_ids.add(car.id)
+
+            changed_cars[car.id] = car
+
+        Car.objects.bulk_update(
+            [
+                car
+                for car_id, car in changed_cars.items()
+                if car_id not in availability_ids
+            ],
+            position_fields,
+            batch_size=batch_size,
+        )
+        Car.objects.bulk_update(
+            [changed_cars[car_id] for car_id in availability_ids],
+            position_fields + ["is_available"],
+            batch_size=batch_size,
+        )
+
+        if changed_cars:
+            bump_table_version(Car)
+
+        moved = [
+            (car.id, car.latitude, car.longitude)
+            for car in changed_cars.values()
+        ]
+        moved_positions.update(
+            (latitude, longitude) for _, latitude, longitude in moved
+        )
+        transaction.on_commit(
+            lambda: refresh_moved_cars(moved, moved_positions)
+        )
+
+    return {
+        "updated": len(moved),
+        "failed": sorted(failed, key=lambda failure: failure["index"]),
+    }
+
+
+def refresh_moved_cars(moved, positions):
+    """Переносит машины в индексе и сбрасывает затронутые тайлы."""
+    for car_id, latitude, longitude in moved:
+        nearest_cars_index.update(car_id, latitude, longitude)
+
+    invalidate_tiles(*positions)
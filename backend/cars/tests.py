@@ -0,0 +1,867 @@
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from core.pagination import CursorOptInPagination
+from core.renderers import FastJSONRenderer
+from core.testing import QueryBudgetMixin
+from core.models import Job
+from core.texts import (
+    CAR_DEFAULT_IMAGE,
+    CAR_DEFAULT_IMAGE_VARIANTS_DIR,
+    CLUSTER_BBOX_FORMAT,
+    CLUSTER_BBOX_NOT_NUMBERS,
+    CLUSTER_BBOX_OUT_OF_RANGE,
+)
+from core.versions import PendingTableVersions, get_table_versions
+from reviews.models import Review
+from users.models import User, UserCoordinates
+
+from .geo import get_grid_cell, nearest_cars_index, prefilter_nearest
+from .models import Car, CarVarious, StoredImage
+from .serializers import CarSerializer, CarValuesSerializer
+from .tiles import tile_for
+from .utils import get_synthetic_state_number
+
+CENTER_LATITUDE = 55.75
+CENTER_LONGITUDE = 37.61
+
+
+def create_car(index, various=(), **fields):
+    """Машина с уникальным госномером рядом с центром."""
+    fields = {
+        "latitude": CENTER_LATITUDE + index * 0.001,
+        "longitude": CENTER_LONGITUDE + index * 0.001,
+        "company": "YandexDrive",
+        "brand": "KIA",
+        "model": "RIO",
+        "type_car": "sedan",
+        "state_number": get_synthetic_state_number(index),
+        "type_engine": "benzine",
+        "power_reserve": "full",
+        "kind_car": "Passenger",
+        **fields,
+    }
+    car = Car.objects.create(**fields)
+    car.various.set(various)
+    return car
+
+
+def create_cars(count, start=1):
+    various = [
+        CarVarious.objects.get_or_create(slug=slug, defaults={"name": slug})[
+            0
+        ]
+        for slug in ("child_seat", "heated_steering_wheel")
+    ]
+    return [
+        create_car(index, various=various)
+        for index in range(start, start + count)
+    ]
+
+
+def create_user(email="driver@example.com", latitude=None, longitude=None):
+    coordinates = None
+
+    if latitude is not None:
+        coordinates = UserCoordinates.objects.create(
+            latitude=latitude, longitude=longitude
+        )
+
+    return User.objects.create_user(
+        email=email,
+        password="password-123",
+        first_name="Иван",
+        last_name="Иванов",
+        coordinates=coordinates,
+    )
+
+
+class CarQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Страница машин выбирается фиксированным числом запросов,
+    не зависящим от количества машин на ней.
+    """
+
+    LIST_BUDGET = 4
+    DISTANCE_LIST_BUDGET = 5
+    DETAIL_BUDGET = 3
+    NEAREST_BUDGET = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.cars = create_cars(3)
+            cls.user = create_user(
+                latitude=CENTER_LATITUDE, longitude=CENTER_LONGITUDE
+            )
+
+    def add_cars(self, count=20):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_cars(count, start=len(self.cars) + 1)
+
+    def test_list_anonymous(self):
+        self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/cars/")
+        self.add_cars()
+        response = self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/cars/")
+        self.assertEqual(response.data["count"], 23)
+
+    def test_list_sparse_fields(self):
+        self.add_cars()
+        self.assertQueryBudget(
+            self.LIST_BUDGET - 1, "/api/v1/cars/?fields=id,coordinates"
+        )
+
+    def test_list_cursor(self):
+        self.add_cars()
+        self.assertQueryBudget(
+            self.LIST_BUDGET - 1, "/api/v1/cars/?pagination=cursor"
+        )
+
+    def test_list_by_distance(self):
+        self.client.force_authenticate(self.user)
+        self.assertQueryBudget(self.DISTANCE_LIST_BUDGET, "/api/v1/cars/")
+        self.add_cars()
+        self.assertQueryBudget(self.DISTANCE_LIST_BUDGET, "/api/v1/cars/")
+
+    def test_detail(self):
+        self.assertQueryBudget(
+            self.DETAIL_BUDGET, f"/api/v1/cars/{self.cars[0].id}/"
+        )
+
+    def test_nearest(self):
+        url = (
+            f"/api/v1/cars/nearest/?lat={CENTER_LATITUDE}"
+            f"&lon={CENTER_LONGITUDE}&k=10"
+        )
+        # Первый запрос загружает индекс ближайших машин.
+        self.client.get(url)
+        self.add_cars()
+        response = self.assertQueryBudget(self.NEAREST_BUDGET, url)
+        self.assertEqual(len(response.data), 10)
+
+
+@mock.patch.object(CursorOptInPagination, "page_size", 5)
+class CarDistanceListTests(APITestCase):
+    """
+    Список по расстоянию берёт страницы из окрестности пользователя,
+    но count и состав страниц совпадают с полным списком.
+    """
+
+    FAR_CARS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        create_cars(29)
+
+        for index in range(100, 100 + cls.FAR_CARS):
+            create_car(
+                index,
+                latitude=CENTER_LATITUDE + 1,
+                longitude=CENTER_LONGITUDE + 1,
+            )
+
+        cls.user = create_user(
+            latitude=CENTER_LATITUDE, longitude=CENTER_LONGITUDE
+        )
+
+    def get_expected_ids(self, latitude=CENTER_LATITUDE):
+        return [
+            car.id
+            for car in sorted(
+                Car.objects.all(),
+                key=lambda car: (
+                    (car.latitude - latitude) ** 2
+                    + (car.longitude - CENTER_LONGITUDE) ** 2,
+                    car.id,
+                ),
+            )
+        ]
+
+    def test_pages_match_full_list(self):
+        self.client.force_authenticate(self.user)
+        total = Car.objects.count()
+        ids = []
+
+        for page in range(1, 8):
+            response = self.client.get(f"/api/v1/cars/?page={page}")
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(response.data["count"], total)
+            ids.extend(car["id"] for car in response.data["results"])
+
+        self.assertEqual(ids, self.get_expected_ids())
+
+    def test_window_grows_with_page_depth(self):
+        queryset = Car.objects.order_by("id")
+        window = prefilter_nearest(
+            queryset, CENTER_LATITUDE, CENTER_LONGITUDE, 6
+        )
+        ids = set(window.values_list("id", flat=True))
+
+        # Дальние машины в окно первой страницы не попадают.
+        self.assertEqual(len(ids), 29)
+        self.assertTrue(set(self.get_expected_ids()[:6]) <= ids)
+
+        deep_window = prefilter_nearest(
+            queryset, CENTER_LATITUDE, CENTER_LONGITUDE, 30
+        )
+        self.assertEqual(deep_window.count(), 29 + self.FAR_CARS)
+
+    def test_ring_expansion(self):
+        # В ячейке пользователя и соседних машин нет.
+        latitude = CENTER_LATITUDE - 0.05
+        window = prefilter_nearest(
+            Car.objects.all(), latitude, CENTER_LONGITUDE, 5
+        )
+        ids = set(window.values_list("id", flat=True))
+
+        self.assertTrue(set(self.get_expected_ids(latitude)[:5]) <= ids)
+        self.assertFalse(
+            ids & set(
+                Car.objects.filter(
+                    latitude=CENTER_LATITUDE + 1
+                ).values_list("id", flat=True)
+            )
+        )
+
+    def test_small_fleet_returns_queryset(self):
+        queryset = Car.objects.all()
+
+        with self.assertNumQueries(1):
+            window = prefilter_nearest(
+                queryset, CENTER_LATITUDE, CENTER_LONGITUDE, 100
+            )
+
+        self.assertIs(window, queryset)
+
+
+class CarRatingFilterTests(APITestCase):
+    """Границы корзин ?rating= и диапазона ?rating_min=/?rating_max=."""
+
+    # Средний рейтинг: (сумма оценок, количество).
+    RATINGS = {
+        "unrated": (0, 0),
+        "3.49": (Decimal("6.98"), 2),
+        "3.5": (7, 2),
+        "4.49": (Decimal("8.98"), 2),
+        "4.5": (9, 2),
+        "5": (5, 1),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cars = dict(zip(cls.RATINGS, create_cars(len(cls.RATINGS))))
+
+        for name, (rating_sum, rating_count) in cls.RATINGS.items():
+            if rating_count:
+                Car.objects.filter(pk=cls.cars[name].pk).add_rating(
+                    rating_sum, rating_count
+                )
+
+    def get_names(self, query):
+        response = self.client.get(f"/api/v1/cars/?fields=id&{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = {car["id"] for car in response.data["results"]}
+        return {name for name, car in self.cars.items() if car.id in ids}
+
+    def test_bucket_edges(self):
+        self.assertEqual(self.get_names("rating=4"), {"3.5", "4.49"})
+        self.assertEqual(self.get_names("rating=3"), {"3.49"})
+        self.assertEqual(self.get_names("rating=5"), {"4.5", "5"})
+
+    def test_several_buckets(self):
+        self.assertEqual(self.get_names("rating=3,5"), {"3.49", "4.5", "5"})
+
+    def test_unrated_cars_excluded(self):
+        self.assertEqual(self.get_names("rating=0"), set())
+        self.assertEqual(self.get_names("rating_max=3.5"), {"3.49", "3.5"})
+
+    def test_range(self):
+        self.assertEqual(
+            self.get_names("rating_min=3.5&rating_max=4.5"),
+            {"3.5", "4.49", "4.5"},
+        )
+
+
+class CarListCacheTests(APITestCase):
+    """
+    Условные GET и кеш анонимного списка машин: 304 по If-None-Match,
+    сброс после записи в машины и отзывы, ключ с учётом ?fields=,
+    ?omit= и режима пагинации.
+    """
+
+    url = "/api/v1/cars/"
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.car = create_cars(2)[0]
+            cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url=url, **headers):
+        return self.client.get(url, **headers)
+
+    def assertCache(self, url, status):
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response["X-Cache"], status)
+        return response
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_car_write_invalidates(self):
+        etag = self.assertCache(self.url, "MISS")["ETag"]
+        self.assertCache(self.url, "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car.is_available = False
+            self.car.save()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertFalse(response.data["results"][0]["is_available"])
+
+    def test_review_write_invalidates(self):
+        etag = self.assertCache(self.url, "MISS")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, car=self.car, rating=4)
+
+        response = self.assertCache(self.url, "MISS")
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(float(response.data["results"][0]["rating"]), 4)
+
+    def test_key_includes_sparse_fields(self):
+        self.assertCache(self.url, "MISS")
+        response = self.assertCache(f"{self.url}?fields=id,company", "MISS")
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "company"}
+        )
+        self.assertCache(f"{self.url}?fields=company,id", "HIT")
+
+        response = self.assertCache(f"{self.url}?omit=images", "MISS")
+        self.assertNotIn("images", response.data["results"][0])
+        self.assertCache(f"{self.url}?omit=images", "HIT")
+
+    def test_key_includes_pagination(self):
+        self.assertCache(self.url, "MISS")
+        response = self.assertCache(f"{self.url}?pagination=cursor", "MISS")
+        self.assertNotIn("count", response.data)
+        self.assertCache(f"{self.url}?pagination=cursor", "HIT")
+
+    def test_authenticated_list_not_cached(self):
+        self.client.force_authenticate(self.user)
+
+        self.assertNotIn("X-Cache", self.get())
+        self.assertNotIn("X-Cache", self.get())
+
+
+class CarValuesSerializerTests(APITestCase):
+    """
+    Список (CarValuesSerializer) и карточка машины (CarSerializer)
+    отдают машину одинаково.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.car = create_cars(1)[0]
+        cls.car.image_variants = {
+            "marker": {
+                "webp": "variants/marker.webp",
+                "fallback": "variants/marker.png",
+            }
+        }
+        cls.car.save(update_fields=["image_variants"])
+        Car.objects.filter(pk=cls.car.pk).add_rating(9, 2)
+
+    def test_fields_match(self):
+        self.assertEqual(
+            list(CarValuesSerializer.values), CarSerializer.Meta.fields
+        )
+
+    def test_list_matches_detail(self):
+        for query in ("", "?fields=id,coordinates,rating", "?omit=images"):
+            with self.subTest(query=query):
+                listed = self.client.get(f"/api/v1/cars/{query}")
+                detail = self.client.get(
+                    f"/api/v1/cars/{self.car.id}/{query}"
+                )
+
+                self.assertEqual(listed.json()["results"], [detail.json()])
+
+    def test_fast_renderer_matches_json_renderer(self):
+        url = f"/api/v1/cars/{self.car.id}/"
+        fast = self.client.get(url)
+
+        with override_settings(FAST_JSON_RENDERER=False):
+            default = self.client.get(url)
+
+        self.assertIsInstance(fast.accepted_renderer, FastJSONRenderer)
+        self.assertNotIsInstance(default.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(fast.content, default.content)
+
+
+class NearestCarsTests(APITestCase):
+    """Радиус поиска ближайших машин, включая нулевой."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_cars(3)
+
+    def setUp(self):
+        # Индекс общий для процесса: перечитываем его из базы теста.
+        nearest_cars_index.load()
+
+    def get_nearest(self, **params):
+        query = "&".join(f"{name}={value}" for name, value in params.items())
+        response = self.client.get(
+            f"/api/v1/cars/nearest/?lat={CENTER_LATITUDE}"
+            f"&lon={CENTER_LONGITUDE}&{query}"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return [car["id"] for car in response.data]
+
+    def test_without_radius(self):
+        self.assertEqual(len(self.get_nearest(k=2)), 2)
+
+    def test_radius(self):
+        # Ближайшая машина примерно в 130 м от центра.
+        self.assertEqual(self.get_nearest(k=2, radius_km=0.001), [])
+        self.assertEqual(len(self.get_nearest(k=2, radius_km=0.2)), 1)
+
+    def test_zero_radius_is_not_unlimited(self):
+        self.assertEqual(self.get_nearest(k=2, radius_km=0), [])
+
+    def test_index_follows_committed_changes_only(self):
+        car_id = Car.objects.order_by("id").first().id
+
+        try:
+            with transaction.atomic():
+                Car.objects.get(pk=car_id).delete()
+                create_car(
+                    50,
+                    latitude=CENTER_LATITUDE,
+                    longitude=CENTER_LONGITUDE,
+                )
+                raise DatabaseError
+        except DatabaseError:
+            pass
+
+        self.assertEqual(self.get_nearest(k=1), [car_id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_car = create_car(
+                50, latitude=CENTER_LATITUDE, longitude=CENTER_LONGITUDE
+            )
+
+        self.assertEqual(self.get_nearest(k=1), [new_car.id])
+
+
+class TelemetryTests(APITestCase):
+    """Пакетное обновление положения и доступности машин."""
+
+    url = "/api/v1/cars/telemetry/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cars = create_cars(2)
+        cls.admin = create_user("admin@example.com")
+        cls.admin.is_staff = True
+        cls.admin.save()
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def post(self, rows):
+        return self.client.post(self.url, rows, format="json")
+
+    def test_admin_only(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.post([]).status_code, (401, 403))
+
+        self.client.force_authenticate(create_user())
+        self.assertEqual(self.post([]).status_code, 403)
+
+    def test_partial_failures(self):
+        car = self.cars[0]
+        response = self.post(
+            [
+                {"id": car.id, "lat": 55.8, "lon": 37.7},
+                {"id": car.id, "lat": 91, "lon": 37.7},
+                {"id": 10 ** 6, "lat": 55.8, "lon": 37.7},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(
+            [failure["index"] for failure in response.data["failed"]],
+            [1, 2],
+        )
+        car.refresh_from_db()
+        self.assertEqual((car.latitude, car.longitude), (55.8, 37.7))
+
+    def test_max_rows(self):
+        rows = [
+            {"id": car.id, "lat": 55.8, "lon": 37.7} for car in self.cars
+        ]
+
+        with mock.patch("cars.views.TELEMETRY_MAX_ROWS", 1):
+            response = self.post(rows)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Car.objects.filter(latitude=55.8).exists())
+
+    def test_grid_cell_updated(self):
+        car = self.cars[0]
+        self.post([{"id": car.id, "lat": 59.93, "lon": 30.31}])
+
+        car.refresh_from_db()
+        self.assertEqual(
+            (car.cell_latitude, car.cell_longitude),
+            get_grid_cell(59.93, 30.31),
+        )
+
+    def test_availability_written_only_when_supplied(self):
+        supplied, omitted = self.cars
+
+        def toggle_omitted(latitude, longitude):
+            # Изменение доступности, сделанное после чтения машин.
+            Car.objects.filter(pk=omitted.pk).update(is_available=False)
+            return get_grid_cell(latitude, longitude)
+
+        with mock.patch("cars.telemetry.get_grid_cell", toggle_omitted):
+            response = self.post(
+                [
+                    {
+                        "id": supplied.id,
+                        "lat": 55.8,
+                        "lon": 37.7,
+                        "is_available": False,
+                    },
+                    {"id": omitted.id, "lat": 55.8, "lon": 37.7},
+                ]
+            )
+
+        self.assertEqual(response.data["updated"], 2)
+        self.assertFalse(Car.objects.filter(is_available=True).exists())
+
+
+class CarClusterTests(APITestCase):
+    """Кластеры мельчают с ростом масштаба."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Пять машин примерно в 110 м друг от друга.
+        create_cars(5)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_clusters(self, zoom, bbox="37.6105,55.7505,37.6155,55.7555"):
+        return self.client.get(
+            f"/api/v1/cars/clusters/?bbox={bbox}&zoom={zoom}"
+        )
+
+    def count_clusters(self, zoom):
+        response = self.get_clusters(zoom)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            sum(cluster["count"] for cluster in response.data["clusters"]),
+            5,
+        )
+        return len(response.data["clusters"])
+
+    def test_clusters_shrink_with_zoom(self):
+        counts = [self.count_clusters(zoom) for zoom in range(4, 20)]
+
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[0], 1)
+        self.assertLess(self.count_clusters(12), self.count_clusters(16))
+        self.assertEqual(counts[-1], 5)
+
+    def test_coarse_zoom_is_cached_for_whole_map(self):
+        self.get_clusters(4, bbox="0,0,10,10")
+
+        with self.assertNumQueries(0):
+            response = self.get_clusters(4)
+
+        self.assertEqual(response.data["clusters"][0]["count"], 5)
+
+    def test_invalid_bbox(self):
+        for bbox, message in (
+            ("a,b,c,d", CLUSTER_BBOX_NOT_NUMBERS),
+            ("37,55,38", CLUSTER_BBOX_FORMAT),
+            ("37,55,38,91", CLUSTER_BBOX_OUT_OF_RANGE),
+        ):
+            with self.subTest(bbox=bbox):
+                response = self.get_clusters(4, bbox=bbox)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["bbox"], [message])
+
+    def test_bbox_limited_by_zoom(self):
+        response = self.get_clusters(16, bbox="37,55,38,56")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("bbox", response.data)
+
+
+class CarTileCacheTests(APITestCase):
+    """
+    Тайл сбрасывается по своей версии, только когда в нём появляется,
+    перемещается или исчезает машина. Ключи тайлов не удаляются.
+    """
+
+    ZOOM = 14
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.car = create_cars(1)[0]
+            cls.other_car = create_cars(1, start=90)[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def get_tile_url(self, latitude, longitude):
+        x, y = tile_for(latitude, longitude, self.ZOOM)
+        return f"/api/v1/cars/tiles/{self.ZOOM}/{x}/{y}/"
+
+    def get_tile_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [feature["id"] for feature in response.data["features"]]
+
+    def move_car(self, latitude):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car.latitude = latitude
+            self.car.save()
+
+    def test_moved_car_changes_old_and_new_tiles(self):
+        url = self.get_tile_url(self.car.latitude, self.car.longitude)
+        new_latitude = self.car.latitude + 1
+        new_url = self.get_tile_url(new_latitude, self.car.longitude)
+
+        self.assertEqual(self.get_tile_ids(url), [self.car.id])
+        self.assertEqual(self.get_tile_ids(new_url), [])
+
+        self.move_car(new_latitude)
+
+        self.assertEqual(self.get_tile_ids(url), [])
+        self.assertEqual(self.get_tile_ids(new_url), [self.car.id])
+
+    def test_unrelated_tile_stays_cached(self):
+        url = self.get_tile_url(
+            self.other_car.latitude, self.other_car.longitude
+        )
+        self.assertNotEqual(
+            url, self.get_tile_url(self.car.latitude, self.car.longitude)
+        )
+        self.get_tile_ids(url)
+
+        self.move_car(self.car.latitude + 0.001)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_tile_ids(url), [self.other_car.id])
+
+    def test_stale_tile_is_not_deleted(self):
+        url = self.get_tile_url(self.car.latitude, self.car.longitude)
+        self.get_tile_ids(url)
+        keys = set(cache._cache)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car.delete()
+
+        self.assertEqual(set(cache._cache), keys)
+        self.assertEqual(self.get_tile_ids(url), [])
+
+
+class TableVersionTests(TestCase):
+    """Версия таблицы увеличивается один раз на транзакцию."""
+
+    def get_version(self):
+        return get_table_versions(Car)[0]
+
+    def test_bump_once_per_transaction(self):
+        version = self.get_version()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            cars = create_cars(3)
+            cars[0].delete()
+
+        self.assertEqual(
+            len(
+                [
+                    callback
+                    for callback in callbacks
+                    if isinstance(callback, PendingTableVersions)
+                ]
+            ),
+            1,
+        )
+        self.assertEqual(self.get_version(), version + 1)
+
+    def test_no_bump_before_commit(self):
+        version = self.get_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_cars(1)
+            self.assertEqual(self.get_version(), version)
+
+        callbacks[0]()
+        self.assertEqual(self.get_version(), version + 1)
+
+    def test_rolled_back_savepoint(self):
+        version = self.get_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    create_cars(1)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+
+            create_cars(1, start=2)
+
+        self.assertEqual(self.get_version(), version + 1)
+
+
+class DefaultImageVariantsTests(TestCase):
+    """
+    Копии изображения по умолчанию строятся один раз командой
+    и не в каталоге оригинала; новые машины задач не ставят.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, "default_image"))
+        shutil.copy(
+            os.path.join(settings.MEDIA_ROOT, CAR_DEFAULT_IMAGE),
+            os.path.join(media_root, CAR_DEFAULT_IMAGE),
+        )
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+
+    def test_default_image_is_not_enqueued(self):
+        create_cars(3)
+
+        self.assertFalse(Job.objects.exists())
+        self.assertFalse(Car.objects.exclude(image_variants={}).exists())
+
+    def test_command_builds_default_variants_once(self):
+        call_command("build_image_variants", stdout=StringIO())
+        variants = StoredImage.objects.get(name=CAR_DEFAULT_IMAGE).variants
+
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "default_image")),
+            [os.path.basename(CAR_DEFAULT_IMAGE)],
+        )
+
+        for names in variants.values():
+            for name in names.values():
+                self.assertTrue(
+                    name.startswith(CAR_DEFAULT_IMAGE_VARIANTS_DIR)
+                )
+                self.assertTrue(
+                    os.path.exists(os.path.join(self.media_root, name))
+                )
+
+        car = create_cars(1)[0]
+        car.refresh_from_db()
+        self.assertEqual(car.image_variants, variants)
+        self.assertFalse(Job.objects.exists())
+
+
+class LoadFixturesTests(TestCase):
+    """Загрузчик машин сообщает только о действительно записанных строках."""
+
+    data_dir = os.path.join(settings.BASE_DIR, "cars", "data")
+    various_path = os.path.join(data_dir, "car_various.json")
+    cars_path = os.path.join(data_dir, "cars.json")
+
+    def load(self, *paths, **options):
+        stdout = StringIO()
+        call_command("load_fixtures", *paths, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def write_fixture(self, records):
+        file = tempfile.NamedTemporaryFile(
+            "w", suffix=".json", encoding="utf-8", delete=False
+        )
+        self.addCleanup(os.remove, file.name)
+
+        with file:
+            json.dump(records, file)
+        return file.name
+
+    def test_load(self):
+        output = self.load(self.various_path, self.cars_path)
+
+        self.assertIn("загружены: 6 записей", output)
+        self.assertIn("загружены: 100 записей", output)
+        self.assertEqual(Car.objects.count(), 100)
+        self.assertTrue(
+            Car.objects.filter(cell_latitude__gt=0, various__isnull=False)
+        )
+
+    def test_ignore_conflicts_counts_written_rows(self):
+        self.load(self.various_path, self.cars_path)
+        output = self.load(
+            self.various_path, self.cars_path, ignore_conflicts=True
+        )
+
+        self.assertIn("загружены: 0 записей", output)
+        self.assertIn("пропущено существующих: 100", output)
+        self.assertEqual(Car.objects.count(), 100)
+
+    def test_unsupported_model(self):
+        self.load(self.various_path)
+        path = self.write_fixture(
+            [
+                {
+                    "model": "cars.carvarious",
+                    "pk": 100,
+                    "fields": {"name": "Багажник", "slug": "trunk"},
+                },
+                {
+                    "model": "users.usercoordinates",
+                    "pk": 1,
+                    "fields": {"latitude": 55.75, "longitude": 37.61},
+                },
+            ]
+        )
+        output = self.load(path)
+
+        self.assertIn("users.usercoordinates не поддерживается", output)
+        self.assertNotIn("успешно", output)
+        self.assertFalse(CarVarious.objects.filter(slug="trunk").exists())
+        self.assertFalse(UserCoordinates.objects.exists())
@@ -0,0 +1,150 @@
+import math
+import time
+
+from django.core.cache import cache
+
+from core.texts import TILE_CACHE_TIMEOUT, TILE_MAX_ZOOM, TILE_MIN_ZOOM
+
+TILE_CACHE_KEY = "cars:tile:{version}:{z}:{x}:{y}"
+TILE_VERSION_KEY = "cars:tile-version:{z}:{x}:{y}"
+MAX_MERCATOR_LATITUDE = 85.0511287798
+
+
+def tile_bounds(z, x, y):
+    """
+    Границы тайла z/x/y в проекции Web Mercator:
+    (min_lon, min_lat, max_lon, max_lat).
+    """
+    n = 2 ** z
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (
+        x / n * 360.0 - 180.0,
+        latitude(y + 1),
+        (x + 1) / n * 360.0 - 180.0,
+        latitude(y),
+    )
+
+
+def tile_for(latitude, longitude, z):
+    """Координаты тайла уровня z, содержащего точку."""
+    n = 2 ** z
+    latitude = max(
+        -MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, latitude)
+    )
+    phi = math.radians(latitude)
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(phi)) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def build_tile(queryset, z, x, y):
+    """Компактный GeoJSON с машинами, попадающими в тайл."""
+    min_longitude, min_latitude, max_longitude, max_latitude = tile_bounds(
+        z, x, y
+    )
+    rows = (
+        queryset.filter(
+            latitude__gte=min_latitude,
+            latitude__lt=max_latitude,
+            longitude__gte=min_longitude,
+            longitude__lt=max_longitude,
+        )
+        .order_by()
+        .values_list(
+            "id",
+            "latitude",
+            "longitude",
+            "company",
+            "type_engine",
+            "is_available",
+        )
+    )
+
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "id": car_id,
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [longitude, latitude],
+                },
+                "properties": {
+                    "company": company,
+                    "type_engine": type_engine,
+                    "is_available": is_available,
+                },
+            }
+            for (
+                car_id,
+                latitude,
+                longitude,
+                company,
+                type_engine,
+                is_available,
+            ) in rows
+        ],
+    }
+
+
+def get_tile_version(z, x, y):
+    """
+    Версия тайла z/x/y из кеша.
+
+    Отсутствующая версия заводится по текущему времени, а не с нуля:
+    если ключ версии вытеснен из кеша, новая версия не совпадёт
+    ни с одной из прежних и устаревший тайл не будет найден.
+    """
+    key = TILE_VERSION_KEY.format(z=z, x=x, y=y)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_tile(queryset, z, x, y):
+    """
+    Возвращает тайл из кэша, при промахе строит и кэширует его.
+
+    Ключ содержит версию тайла, которая увеличивается только
+    при изменении машин в этом тайле. Версии хранятся в кеше,
+    поэтому с несколькими процессами он должен быть общим.
+    """
+    version = get_tile_version(z, x, y)
+    key = TILE_CACHE_KEY.format(version=version, z=z, x=x, y=y)
+    tile = cache.get(key)
+
+    if tile is None:
+        tile = build_tile(queryset, z, x, y)
+        cache.set(key, tile, TILE_CACHE_TIMEOUT)
+
+    return tile
+
+
+def invalidate_tiles(*positions):
+    """
+    Увеличивает версии тайлов всех уровней, содержащих указанные точки.
+
+    Закешированные тайлы не удаляются: они перестают запрашиваться
+    и вытесняются по таймауту.
+    """
+    keys = set()
+
+    for latitude, longitude in positions:
+        for z in range(TILE_MIN_ZOOM, TILE_MAX_ZOOM + 1):
+            x, y = tile_for(latitude, longitude, z)
+            keys.add(TILE_VERSION_KEY.format(z=z, x=x, y=y))
+
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Версии ещё нет: при чтении тайла заведётся новая.
+            pass
@@ -1,26 +1,112 @@
-from PIL import Image
+import hashlib
+import os
+from io import BytesIO
 
-from core.texts import TARGET_IMAGE_SIZE
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
 
+from core.texts import (
+    IMAGE_QUALITY,
+    IMAGE_UPLOAD_DIR,
+    IMAGE_VARIANTS,
+)
 
-def resize_image(image_path, target_size=TARGET_IMAGE_SIZE):
-    """Сжимаем и сохраняем изображение до установленных значений."""
-    try:
-        image = Image.open(image_path)
-        image = image.resize(target_size, resample=Image.LANCZOS)
-        image.save(image_path)
+WEBP_FORMAT = ("WEBP", "webp")
+JPEG_FORMAT = ("JPEG", "jpg")
+PNG_FORMAT = ("PNG", "png")
+# Буквы, допустимые в российских номерах.
+STATE_NUMBER_LETTERS = "авекмнорстух"
 
-    except Exception as e:
-        print(f"Произошла ошибка при обработке изображения: {e}")
-        return None
+
+def get_variant_name(image_name, variant, extension, directory=None):
+    """Имя файла уменьшенной копии рядом с оригиналом или в directory."""
+    stem, _ = os.path.splitext(image_name)
+
+    if directory is not None:
+        stem = os.path.join(directory, os.path.basename(stem))
+    return f"{stem}_{variant}.{extension}"
+
+
+def make_image_variants(image_name, variants=IMAGE_VARIANTS, directory=None):
+    """
+    Строит уменьшенные копии изображения в WebP и запасном формате.
+
+    Запасной формат - PNG для изображений с прозрачностью, иначе JPEG.
+    Копии сохраняются рядом с оригиналом или в каталоге directory.
+    Оригинал не изменяется. Возвращает словарь вида
+    {"marker": {"webp": имя, "fallback": имя}, ...}.
+    """
+    with default_storage.open(image_name) as file:
+        image = Image.open(file)
+        image.load()
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    fallback = PNG_FORMAT if has_alpha else JPEG_FORMAT
+    result = {}
+
+    for variant, size in variants.items():
+        resized = ImageOps.fit(image, size, method=Image.LANCZOS)
+        result[variant] = {
+            "webp": save_variant(
+                resized, image_name, variant, WEBP_FORMAT, directory
+            ),
+            "fallback": save_variant(
+                resized, image_name, variant, fallback, directory
+            ),
+        }
+
+    return result
+
+
+def save_variant(image, image_name, variant, image_format, directory=None):
+    """Сохраняет копию в хранилище, заменяя прежнюю."""
+    format_name, extension = image_format
+    name = get_variant_name(image_name, variant, extension, directory)
+    buffer = BytesIO()
+    image.save(buffer, format_name, quality=IMAGE_QUALITY)
+
+    if default_storage.exists(name):
+        default_storage.delete(name)
+
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def get_file_digest(file):
+    """SHA-256 содержимого файла."""
+    digest = hashlib.sha256()
+
+    for chunk in file.chunks():
+        digest.update(chunk)
+
+    return digest.hexdigest()
 
 
 def image_upload_to(instance, filename):
     """
     Генерация пути сохранения изображения автомобиля.
+
+    Путь определяется хешем содержимого, поэтому одна и та же
+    фотография, загруженная для многих машин, хранится один раз.
     """
-    upload_path = (
-        f"cars/images/{instance.company}/"
-        f"{instance.brand}_{instance.model}/{filename}"
-    )
-    return upload_path
+    digest = get_file_digest(instance.image)
+    _, extension = os.path.splitext(filename)
+    return f"{IMAGE_UPLOAD_DIR}{digest[:2]}/{digest}{extension.lower()}"
+
+
+def get_synthetic_state_number(car_id):
+    """
+    Номер формата а123бв456 для синтетических машин, однозначно
+    определяемый id. Регион начинается с 500, поэтому номера
+    не совпадают с номерами из фикстур.
+    """
+    letters_count = len(STATE_NUMBER_LETTERS)
+    number, rest = car_id % 999 + 1, car_id // 999
+    letters = ""
+
+    for _ in range(3):
+        rest, index = divmod(rest, letters_count)
+        letters += STATE_NUMBER_LETTERS[index]
+
+    return f"{letters[0]}{number:03d}{letters[1:]}{500 + rest}"
@@ -1,37 +1,41 @@
+from contextlib import contextmanager
+
 from django.core.validators import RegexValidator
+from django.db import IntegrityError, transaction
 
 from rest_framework import serializers
 
-from core.texts import CAR_STATE_NUMBER_VALIDATOR_MESSAGE
+from core.texts import (
+    CAR_STATE_NUMBER_EXISTS,
+    CAR_STATE_NUMBER_VALIDATOR_MESSAGE,
+)
+
+state_number_validator = RegexValidator(
+    regex=r"^[а-яА-Я]{1}\d{3}[а-яА-Я]{2}\d{2,3}$",
+    message=CAR_STATE_NUMBER_VALIDATOR_MESSAGE,
+)
 
 
 def validate_state_number(value):
     """Валидатор для проверки корректности формата
     государственного номера автомобиля."""
-
-    state_number_validator = RegexValidator(
-        regex=r"^[а-яА-Я]{1}\d{3}[а-яА-Я]{2}\d{2,3}$",
-        message=CAR_STATE_NUMBER_VALIDATOR_MESSAGE,
-    )
     state_number_validator(value)
 
 
-def state_number_validate(value, instance=None):
-    """
-    Проверка уникальности номера состояния.
+@contextmanager
+def unique_state_number():
     """
-    from cars.models import Car
+    Проверка уникальности госномера при сохранении машины.
 
-    if instance and instance.state_number == value:
-        # Номер остался прежним, валидацию не проводим
-        return value
-
-    queryset = (
-        Car.objects.exclude(pk=instance.pk) if instance else Car.objects.all()
-    )
-
-    if queryset.filter(state_number=value).exists():
-        raise serializers.ValidationError(
-            "Автомобиль с таким номером уже существует."
-        )
-    return value
+    Уникальность обеспечивает ограничение car_state_number_unique,
+    поэтому отдельный запрос перед сохранением не нужен, а параллельные
+    запросы не создадут машины с одинаковым номером. Блок выполняется
+    в точке сохранения, чтобы ошибка не прерывала внешнюю транзакцию.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as error:
+        if "state_number" not in str(error):
+            raise
+        raise serializers.ValidationError(CAR_STATE_NUMBER_EXISTS)
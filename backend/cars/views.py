@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db.models import F
 from django.db.models.functions import Power
 from django.db.transaction import atomic
@@ -5,44 +7,145 @@ from django.db import IntegrityError
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
 
 from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+)
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from core.texts import ADD_REVIEW_SUCCESS, REVIEW_ALREADY_EXISTS
+from core.caching import CachedListMixin, ETagMixin
+from core.mixins import ExportMixin, FastJSONRendererMixin, ValuesListMixin
+from core.serializers import (
+    EXPORT_PARAMETERS,
+    SPARSE_FIELDS_PARAMETERS,
+    get_sparse_fields,
+)
+from core.pagination import CursorOptInPagination
+from core.texts import (
+    ADD_REVIEW_SUCCESS,
+    REVIEW_ALREADY_EXISTS,
+    TILE_MAX_ZOOM,
+    TILE_MIN_ZOOM,
+    TELEMETRY_MAX_ROWS,
+    TELEMETRY_NOT_A_LIST,
+    TELEMETRY_TOO_MANY_ROWS,
+    TILE_NOT_FOUND,
+    TILE_ZOOM_ERROR,
+)
+from reviews.models import Review
 from reviews.serializers import AddReviewSerializer
 
 from .filters import CarFilter
-from .models import Car
-from .serializers import CarSerializer
+from .geo import cluster_cars, nearest_cars_index, prefilter_nearest
+from .models import Car, CarVarious
+from .serializers import (
+    CarSerializer,
+    CarValuesSerializer,
+    ClusterQuerySerializer,
+    NearestCarsQuerySerializer,
+)
+from .telemetry import apply_telemetry
+from .tiles import get_tile
 
 
 @extend_schema(tags=["Машины"])
 @extend_schema_view(
-    list=extend_schema(summary="Список машин"),
-    retrieve=extend_schema(summary="Получение одной машины"),
+    list=extend_schema(
+        summary="Список машин",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
+    retrieve=extend_schema(
+        summary="Получение одной машины",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
     create=extend_schema(summary="Создание машины"),
     update=extend_schema(summary="Полное обновление машины"),
     partial_update=extend_schema(summary="Частичное обновление машины"),
     destroy=extend_schema(summary="Удаление машины"),
     add_review=extend_schema(summary="Добавление отзыва к автомобилю."),
+    export=extend_schema(
+        summary="Выгрузка машин",
+        description="Потоковая выгрузка всех машин, подходящих под фильтры "
+        "списка, в NDJSON или CSV без пагинации.",
+        parameters=EXPORT_PARAMETERS + SPARSE_FIELDS_PARAMETERS,
+        responses={200: None},
+    ),
+    nearest=extend_schema(
+        summary="Ближайшие машины",
+        description="Возвращает k ближайших к точке машин с расстоянием "
+        "в метрах по дуге большого круга.",
+        parameters=[
+            OpenApiParameter("lat", float, required=True),
+            OpenApiParameter("lon", float, required=True),
+            OpenApiParameter("k", int),
+            OpenApiParameter("radius_km", float),
+        ],
+    ),
+    clusters=extend_schema(
+        summary="Кластеры машин на карте",
+        description="Группирует машины в области bbox по ячейкам сетки, "
+        "соответствующей масштабу zoom.",
+        parameters=[
+            OpenApiParameter(
+                "bbox",
+                str,
+                required=True,
+                description="min_lon,min_lat,max_lon,max_lat",
+            ),
+            OpenApiParameter("zoom", int, required=True),
+        ],
+    ),
+    telemetry=extend_schema(
+        summary="Пакетное обновление положения машин",
+        description="Принимает список записей {id, lat, lon, is_available} "
+        "и применяет их одной транзакцией. Некорректные записи "
+        "возвращаются в списке failed и не мешают остальным.",
+    ),
+    tiles=extend_schema(
+        summary="Тайл карты с машинами",
+        description="Компактный GeoJSON с машинами тайла z/x/y: "
+        "координаты, компания, тип двигателя и доступность.",
+    ),
 )
-class CarViewSet(ModelViewSet):
+class CarViewSet(
+    FastJSONRendererMixin,
+    ETagMixin,
+    CachedListMixin,
+    ExportMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Представление для работы с публичными данными автомобилей."""
 
-    queryset = Car.objects.all()
+    queryset = Car.objects.prefetch_related("various")
     serializer_class = CarSerializer
-    pagination_class = PageNumberPagination
+    values_serializer_class = CarValuesSerializer
+    export_filename = "cars"
+    pagination_class = CursorOptInPagination
     permission_classes = [AllowAny]
     filter_backends = [
         DjangoFilterBackend,
     ]
     filterset_class = CarFilter
+    list_cache_name = "cars"
+    list_cache_tables = (
+        Car,
+        CarVarious,
+        Car.various.through,
+        Review,
+    )
+    etag_tables = list_cache_tables
 
     def perform_create(self, serializer, car):
         serializer.save(car=car, user=self.request.user)
@@ -53,24 +156,96 @@ class CarViewSet(ModelViewSet):
         else:
             return CarSerializer
 
-    def get_queryset(self):
-        user_coordinates = (
-            self.request.user.coordinates
-            if self.request.user.is_authenticated
-            else None
+    def get_user_coordinates(self):
+        """Координаты текущего пользователя, если они известны."""
+        if self.request.user.is_authenticated:
+            return self.request.user.coordinates
+        return None
+
+    def get_etag_extra(self):
+        """Порядок списка зависит от координат пользователя."""
+        coordinates = self.get_user_coordinates()
+
+        if self.action != "list" or coordinates is None:
+            return ""
+        return f"{coordinates.latitude},{coordinates.longitude}"
+
+    def get_nearest_limit(self):
+        """
+        Количество ближайших машин, необходимое для запрошенной страницы.
+
+        Берётся на одну машину больше, чтобы пагинатор мог определить
+        наличие следующей страницы.
+        """
+        paginator = self.paginator
+        page_size = paginator.get_page_size(self.request)
+
+        if not page_size or paginator.is_cursor_mode(self.request):
+            return None
+
+        try:
+            page_number = int(
+                self.request.query_params.get(paginator.page_query_param, 1)
+            )
+        except ValueError:
+            return None
+
+        return max(page_number, 1) * page_size + 1
+
+    def get_page_window(self, queryset):
+        """
+        Окрестность пользователя по сетке координат, в которой лежат
+        все машины до запрошенной страницы списка по расстоянию.
+
+        Страница берётся из окна, а общее количество машин пагинатор
+        считает по всему отфильтрованному списку.
+        """
+        user_coordinates = self.get_user_coordinates()
+
+        if self.action != "list" or not user_coordinates:
+            return None
+
+        limit = self.get_nearest_limit()
+
+        if not limit:
+            return None
+
+        return prefilter_nearest(
+            queryset,
+            user_coordinates.latitude,
+            user_coordinates.longitude,
+            limit,
         )
 
+    def prune_queryset(self, queryset):
+        """
+        Не загружает связи, которые не попадут в ответ
+        из-за параметров ?fields= и ?omit=.
+        """
+        fields = get_sparse_fields(self.request, CarSerializer.Meta.fields)
+
+        if "various" not in fields:
+            queryset = queryset.prefetch_related(None)
+
+        return queryset
+
+    def get_cursor_ordering(self):
+        """Порядок курсорной пагинации: по расстоянию, если оно известно."""
+        if self.get_user_coordinates():
+            return ("distance", "id")
+        return ("id",)
+
+    def get_queryset(self):
+        queryset = self.prune_queryset(super().get_queryset())
+        user_coordinates = self.get_user_coordinates()
+
         if user_coordinates:
-            return Car.objects.annotate(
-                distance=Power(
-                    F("coordinates__latitude") - user_coordinates.latitude, 2
-                )
-                + Power(
-                    F("coordinates__longitude") - user_coordinates.longitude, 2
-                )
-            ).order_by("distance")
+            return queryset.annotate(
+                distance=Power(F("latitude") - user_coordinates.latitude, 2)
+                + Power(F("longitude") - user_coordinates.longitude, 2)
+            ).order_by("distance", "id")
         else:
-            return Car.objects.all()
+            return queryset.order_by("id")
 
     @atomic
     def create(self, request, *args, **kwargs):
@@ -128,3 +303,104 @@ class CarViewSet(ModelViewSet):
             )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["GET"])
+    def nearest(self, request):
+        """Поиск ближайших машин по индексу в памяти."""
+        query = NearestCarsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        radius_km = params.get("radius_km")
+        found = nearest_cars_index.nearest(
+            params["lat"],
+            params["lon"],
+            params["k"],
+            radius=radius_km * 1000 if radius_km is not None else None,
+        )
+
+        cars = self.queryset.in_bulk([car_id for car_id, _ in found])
+        found = [
+            (cars[car_id], distance)
+            for car_id, distance in found
+            if car_id in cars
+        ]
+        serializer = self.get_serializer(
+            [car for car, _ in found],
+            many=True,
+        )
+
+        data = serializer.data
+        for item, (_, distance) in zip(data, found):
+            item["distance"] = round(distance, 1)
+
+        return Response(data)
+
+    @action(detail=False, methods=["GET"])
+    def clusters(self, request):
+        """Кластеры машин в видимой области карты."""
+        query = ClusterQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        params = hashlib.md5(self.get_normalized_params().encode())
+        clusters = cluster_cars(
+            queryset,
+            query.validated_data["bbox"],
+            query.validated_data["zoom"],
+            cache_key=params.hexdigest(),
+        )
+
+        return Response(
+            {
+                "zoom": query.validated_data["zoom"],
+                "clusters": clusters,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path=r"tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)",
+    )
+    def tiles(self, request, z, x, y):
+        """Тайл карты с машинами для отрисовки маркеров."""
+        z, x, y = int(z), int(x), int(y)
+
+        if not TILE_MIN_ZOOM <= z <= TILE_MAX_ZOOM:
+            raise ValidationError(
+                {
+                    "error": TILE_ZOOM_ERROR.format(
+                        min_zoom=TILE_MIN_ZOOM,
+                        max_zoom=TILE_MAX_ZOOM,
+                    )
+                }
+            )
+
+        if x >= 2 ** z or y >= 2 ** z:
+            raise NotFound(TILE_NOT_FOUND)
+
+        return Response(get_tile(Car.objects.all(), z, x, y))
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsAdminUser],
+    )
+    def telemetry(self, request):
+        """Пакетное обновление координат и доступности машин."""
+        rows = request.data
+
+        if not isinstance(rows, list):
+            raise ValidationError({"error": TELEMETRY_NOT_A_LIST})
+
+        if len(rows) > TELEMETRY_MAX_ROWS:
+            raise ValidationError(
+                {
+                    "error": TELEMETRY_TOO_MANY_ROWS.format(
+                        max_rows=TELEMETRY_MAX_ROWS
+                    )
+                }
+            )
+
+        return Response(apply_telemetry(rows), status=status.HTTP_200_OK)
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from core.texts import JOB_STATUS_PENDING, LIST_PER_PAGE
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "task",
+        "status",
+        "attempts",
+        "run_at",
+        "created_at",
+    ]
+    list_filter = ["status", "task"]
+    readonly_fields = ["last_error", "created_at", "updated_at"]
+    ordering = ["-created_at"]
+    list_per_page = LIST_PER_PAGE
+    actions = ["requeue"]
+
+    @admin.action(description="Вернуть в очередь")
+    def requeue(self, request, queryset):
+        queryset.update(
+            status=JOB_STATUS_PENDING,
+            attempts=0,
+            run_at=timezone.now(),
+        )
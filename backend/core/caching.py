@@ -0,0 +1,216 @@
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from django_filters.filters import BaseCSVFilter
+from rest_framework import status
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from core.texts import CACHE_HEADER, LIST_CACHE_TIMEOUT
+
+from .metrics import record_list_cache
+from .serializers import FIELDS_PARAM, OMIT_PARAM
+from .versions import get_table_versions
+
+_stats_lock = threading.Lock()
+cache_stats = Counter()
+"Попадания и промахи кеша списков в текущем процессе"
+
+
+def get_request_table_versions(request, models):
+    """Версии таблиц моделей, прочитанные один раз за запрос."""
+    if not hasattr(request, "_table_versions"):
+        request._table_versions = {}
+
+    models = tuple(models)
+
+    if models not in request._table_versions:
+        request._table_versions[models] = get_table_versions(*models)
+
+    return request._table_versions[models]
+
+
+def record_cache_access(name, hit):
+    """Учитывает обращение к кешу списка name."""
+    with _stats_lock:
+        cache_stats[f"{name}:{'hits' if hit else 'misses'}"] += 1
+    record_list_cache(name, hit)
+
+
+def get_cache_stats():
+    """Копия счётчиков попаданий и промахов кеша."""
+    with _stats_lock:
+        return dict(cache_stats)
+
+
+class CachedListMixin:
+    """
+    Кеширование страниц списка для анонимных пользователей.
+
+    Ключ кеша строится из нормализованных параметров фильтрации
+    и пагинации, хоста и версий таблиц list_cache_tables.
+    Изменение любой из этих таблиц меняет ключ, поэтому устаревшие
+    страницы просто перестают запрашиваться и вытесняются по таймауту.
+    """
+
+    list_cache_name = None
+    list_cache_tables = ()
+    list_cache_timeout = LIST_CACHE_TIMEOUT
+
+    def is_list_cacheable(self):
+        return not self.request.user.is_authenticated
+
+    def get_filter_params(self):
+        """Имена параметров запроса фильтра и признак CSV-значения."""
+        filterset_class = getattr(self, "filterset_class", None)
+
+        if filterset_class is None:
+            return {}
+
+        params = {}
+
+        for name, filter_ in filterset_class.base_filters.items():
+            is_csv = isinstance(filter_, BaseCSVFilter)
+            suffixes = getattr(filter_.field.widget, "suffixes", None)
+
+            if suffixes:
+                for suffix in suffixes:
+                    params[f"{name}_{suffix}" if suffix else name] = is_csv
+            else:
+                params[name] = is_csv
+
+        return params
+
+    def get_pagination_params(self):
+        paginator = self.paginator
+        return [
+            param
+            for param in (
+                getattr(paginator, "page_query_param", None),
+                getattr(paginator, "page_size_query_param", None),
+                getattr(paginator, "mode_query_param", None),
+                CursorPagination.cursor_query_param,
+            )
+            if param
+        ]
+
+    def get_normalized_params(self):
+        """
+        Параметры запроса, влияющие на ответ, в каноническом виде:
+        неизвестные и пустые параметры отброшены, значения отсортированы.
+        """
+        query_params = self.request.query_params
+        params = self.get_filter_params()
+        params.update(
+            (param, False) for param in self.get_pagination_params()
+        )
+        params.update({FIELDS_PARAM: True, OMIT_PARAM: True})
+        normalized = []
+
+        for name in sorted(params):
+            values = [value for value in query_params.getlist(name) if value]
+
+            if params[name]:
+                values = [
+                    ",".join(sorted(value.split(","))) for value in values
+                ]
+
+            normalized.extend((name, value) for value in sorted(values))
+
+        return urlencode(normalized)
+
+    def get_list_cache_key(self):
+        versions = ".".join(
+            str(version)
+            for version in get_request_table_versions(
+                self.request, self.list_cache_tables
+            )
+        )
+        url = f"{self.request.get_host()}?{self.get_normalized_params()}"
+        params = hashlib.md5(url.encode()).hexdigest()
+        return f"{self.list_cache_name}:list:{versions}:{params}"
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_list_cacheable():
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_list_cache_key()
+        data = cache.get(key)
+        record_cache_access(self.list_cache_name, data is not None)
+
+        if data is not None:
+            return Response(data, headers={CACHE_HEADER: "HIT"})
+
+        response = super().list(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(key, response.data, self.list_cache_timeout)
+        response[CACHE_HEADER] = "MISS"
+        return response
+
+
+class ETagMixin:
+    """
+    Сильные ETag и условные GET-запросы для чтения списков и объектов.
+
+    ETag вычисляется без обращения к queryset: из версий таблиц
+    etag_tables, адреса запроса и согласованного формата ответа.
+    Если он совпадает с If-None-Match, возвращается 304 без тела,
+    и представление не выполняет ни выборку, ни сериализацию.
+    """
+
+    etag_tables = ()
+    etag_actions = ("list", "retrieve")
+
+    def get_etag_extra(self):
+        """Дополнительные данные, от которых зависит ответ."""
+        return ""
+
+    def get_etag(self):
+        request = self.request
+        versions = get_request_table_versions(request, self.etag_tables)
+        source = "|".join(
+            (
+                ".".join(str(version) for version in versions),
+                request.get_host(),
+                request.get_full_path(),
+                request.accepted_media_type or "",
+                str(self.get_etag_extra()),
+            )
+        )
+        return quote_etag(hashlib.sha1(source.encode()).hexdigest())
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.etag_actions:
+            return handler(request, *args, **kwargs)
+
+        etag = self.get_etag()
+        if_none_match = request.headers.get("If-None-Match")
+
+        if if_none_match and (
+            if_none_match.strip() == "*" or etag in parse_etags(if_none_match)
+        ):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+
+        response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
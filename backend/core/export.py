@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from core.texts import EXPORT_CHUNK_SIZE
+
+from .renderers import FastJSONRenderer
+
+
+def iterate_chunks(rows, size=EXPORT_CHUNK_SIZE):
+    """Разбивает итератор строк на списки по size штук."""
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def serialize_chunks(queryset, serializer_class, context):
+    """
+    Сериализует строки values() queryset частями.
+
+    Строки читаются через QuerySet.iterator (серверный курсор
+    в PostgreSQL), поэтому в памяти находится не больше одной части.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for chunk in iterate_chunks(rows):
+        yield serializer_class(chunk, many=True, context=context).data
+
+
+def stream_ndjson(chunks):
+    """Строки в формате NDJSON: один JSON-объект на строку."""
+    renderer = FastJSONRenderer()
+
+    for chunk in chunks:
+        yield b"".join(renderer.render(row) + b"\n" for row in chunk)
+
+
+def get_csv_cell(value):
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+def stream_csv(chunks, header, expanded):
+    """
+    Строки в формате CSV с заголовком header.
+
+    Словари из expanded раскладываются по отдельным столбцам
+    "поле.ключ", остальные словари и списки пишутся одной ячейкой.
+    """
+    columns = []
+
+    for name in header:
+        if name in expanded:
+            columns.extend(f"{name}.{key}" for key in expanded[name])
+        else:
+            columns.append(name)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for chunk in chunks:
+        for row in chunk:
+            cells = []
+
+            for name in header:
+                if name in expanded:
+                    cells.extend(row[name].get(key) for key in expanded[name])
+                else:
+                    cells.append(get_csv_cell(row[name]))
+
+            writer.writerow(cells)
+
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,89 @@
+import contextvars
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_current_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Метрики одного запроса: выполненные SQL-запросы с длительностью
+    и время участков обработки (сериализация, рендеринг).
+
+    Параметры SQL-запросов не сохраняются: в них бывают хеши паролей,
+    коды сброса и адреса почты.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.timings = defaultdict(float)
+        self._active = set()
+
+    @property
+    def sql_time(self):
+        return sum((duration for _, duration in self.queries), 0.0)
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper(), замеряющая запрос."""
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Прибавляет время блока к участку name. Вложенные замеры
+        одного участка не суммируются повторно.
+        """
+        if name in self._active:
+            yield
+            return
+
+        self._active.add(name)
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - started
+            self._active.discard(name)
+
+
+def get_request_metrics():
+    """Метрики текущего запроса или None, если замер не включён."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_request_metrics():
+    """Включает сбор метрик на время обработки запроса."""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def timed(name, function, *args, **kwargs):
+    """
+    Вызывает function, записывая время в участок name текущего запроса.
+    Без включённого замера накладных расходов почти нет.
+    """
+    metrics = _current_metrics.get()
+
+    if metrics is None:
+        return function(*args, **kwargs)
+
+    with metrics.timer(name):
+        return function(*args, **kwargs)
@@ -0,0 +1,112 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+from core.texts import (
+    JOB_RETRY_BASE_DELAY,
+    JOB_STALE_TIMEOUT,
+    JOB_STATUS_DEAD,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_task_path(task):
+    """Путь импорта задачи: строка или функция."""
+    if isinstance(task, str):
+        return task
+    return f"{task.__module__}.{task.__qualname__}"
+
+
+def enqueue(task, **kwargs):
+    """
+    Ставит задачу в очередь.
+
+    Задача сохраняется в той же транзакции, что и вызывающий код,
+    поэтому при откате она тоже исчезает. Если включён JOBS_RUN_EAGER,
+    задача выполняется сразу после фиксации транзакции.
+    """
+    task_path = get_task_path(task)
+
+    if getattr(settings, "JOBS_RUN_EAGER", False):
+        transaction.on_commit(lambda: import_string(task_path)(**kwargs))
+        return None
+
+    return Job.objects.create(task=task_path, kwargs=kwargs)
+
+
+def requeue_stale_jobs(timeout=JOB_STALE_TIMEOUT):
+    """Возвращает в очередь задачи, зависшие после падения воркера."""
+    return Job.objects.filter(
+        status=JOB_STATUS_RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=JOB_STATUS_PENDING, updated_at=timezone.now())
+
+
+def claim_next_job():
+    """
+    Захватывает ближайшую готовую к запуску задачу.
+
+    Захват - условный UPDATE по статусу, поэтому несколько
+    воркеров не выполнят одну задачу дважды.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=JOB_STATUS_PENDING, run_at__lte=now)
+        .order_by("run_at", "id")
+        .values_list("id", flat=True)[:10]
+    )
+
+    for job_id in candidates:
+        claimed = Job.objects.filter(
+            id=job_id,
+            status=JOB_STATUS_PENDING,
+        ).update(
+            status=JOB_STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+
+        if claimed:
+            return Job.objects.get(id=job_id)
+
+    return None
+
+
+def run_job(job):
+    """
+    Выполняет задачу. Успешная задача удаляется, упавшая
+    откладывается с экспоненциальной задержкой, а после
+    исчерпания попыток помечается как dead.
+    """
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+
+        if job.attempts >= job.max_attempts:
+            job.status = JOB_STATUS_DEAD
+            logger.error("Задача %s не выполнена: %s", job, job.last_error)
+        else:
+            job.status = JOB_STATUS_PENDING
+            job.run_at = timezone.now() + timedelta(
+                seconds=JOB_RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            )
+            logger.warning("Задача %s будет повторена в %s", job, job.run_at)
+
+        job.save(
+            update_fields=["status", "run_at", "last_error", "updated_at"]
+        )
+        return False
+
+    job.delete()
+    return True
@@ -0,0 +1,354 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cars.models import Car, CarVarious
+from reviews.models import Review
+from users.models import User
+
+# Кеши подменяются, чтобы замеры не читали и не портили рабочий кеш:
+# все запросы выполняются в транзакции, которая затем откатывается.
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+}
+FRESH_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark-api",
+    }
+}
+# Смещение широты и долготы для фильтров по диапазону, в градусах.
+RANGE_DELTA = 0.05
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет основные запросы API: список машин, фильтры, отзывы "
+        "и координаты пользователя. Считает p50/p95/p99, число запросов "
+        "к базе и пропускную способность. Изменения в базе откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Количество замеряемых запросов в каждом сценарии.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Количество прогревочных запросов перед замером.",
+        )
+        parser.add_argument(
+            "--scenarios",
+            default="",
+            help="Сценарии через запятую; по умолчанию все.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Включить кеш списков (отдельный, в памяти процесса).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл JSON для сохранения результатов.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Файл JSON с прошлыми результатами для сравнения.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests: нужно хотя бы 2 запроса.")
+
+        self.prepare()
+        scenarios = self.get_scenarios()
+        selected = [
+            name for name in options["scenarios"].split(",") if name
+        ] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+
+        if unknown:
+            raise CommandError(
+                f"Неизвестные сценарии: {', '.join(sorted(unknown))}. "
+                f"Доступны: {', '.join(scenarios)}."
+            )
+
+        results = {}
+
+        with override_settings(
+            CACHES=FRESH_CACHE if options["cache"] else NO_CACHE
+        ):
+            with transaction.atomic():
+                for name in selected:
+                    results[name] = self.run_scenario(
+                        scenarios[name],
+                        options["requests"],
+                        options["warmup"],
+                    )
+                    self.write_result(name, results[name])
+                transaction.set_rollback(True)
+
+        report = {"meta": self.get_meta(options), "results": results}
+
+        if options["compare"]:
+            self.compare(report, options["compare"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Результаты сохранены в {options['output']}"
+                )
+            )
+
+    def prepare(self):
+        """Выбирает из базы машины, пользователей и значения фильтров."""
+        self.cars = list(
+            Car.objects.order_by("id").values_list("id", flat=True)
+        )
+        self.users = list(
+            User.objects.filter(is_active=True, coordinates__isnull=False)
+            .select_related("coordinates")
+            .order_by("id")[:500]
+        )
+
+        if not self.cars or not self.users:
+            raise CommandError(
+                "Нужны машины и пользователи с координатами: "
+                "выполните generate_fleet."
+            )
+
+        center = Car.objects.aggregate(
+            latitude=Avg("latitude"),
+            longitude=Avg("longitude"),
+        )
+        self.latitude = center["latitude"]
+        self.longitude = center["longitude"]
+        self.model = (
+            Car.objects.values("model")
+            .annotate(count=Count("id"))
+            .order_by("-count")
+            .first()["model"]
+        )
+        self.various = (
+            CarVarious.objects.order_by("id").values_list("slug", flat=True)
+        ).first()
+        self.clients = {}
+
+    def get_client(self, user=None):
+        """Клиент на пользователя, чтобы не пересоздавать его на запрос."""
+        key = user.pk if user else None
+
+        if key not in self.clients:
+            client = APIClient(SERVER_NAME=self.get_host())
+
+            if user:
+                client.force_authenticate(user)
+            self.clients[key] = client
+
+        return self.clients[key]
+
+    def get_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        return hosts[0].lstrip(".") if hosts else "localhost"
+
+    def get_user(self, index):
+        return self.users[index % len(self.users)]
+
+    def get_car(self, index):
+        # Простое число разносит запросы по всей таблице.
+        return self.cars[index * 7919 % len(self.cars)]
+
+    def get_filter(self, query):
+        def request(index):
+            return self.get_client().get("/api/v1/cars/", query)
+
+        return request
+
+    def get_scenarios(self):
+        """Сценарии: имя -> функция, выполняющая i-й запрос."""
+        lat_range = {
+            "latitude_min": self.latitude - RANGE_DELTA,
+            "latitude_max": self.latitude + RANGE_DELTA,
+        }
+        lon_range = {
+            "longitude_min": self.longitude - RANGE_DELTA,
+            "longitude_max": self.longitude + RANGE_DELTA,
+        }
+        scenarios = {
+            "cars_list_anonymous": self.get_filter({}),
+            "cars_list_distance": lambda index: self.get_client(
+                self.get_user(index)
+            ).get("/api/v1/cars/"),
+            "cars_filter_type_car": self.get_filter({"type_car": "sedan"}),
+            "cars_filter_company": self.get_filter(
+                {"company": "YandexDrive,BelkaCar"}
+            ),
+            "cars_filter_type_engine": self.get_filter(
+                {"type_engine": "electro"}
+            ),
+            "cars_filter_is_available": self.get_filter(
+                {"is_available": "true"}
+            ),
+            "cars_filter_power_reserve": self.get_filter(
+                {"power_reserve": "full"}
+            ),
+            "cars_filter_model": self.get_filter({"model": self.model}),
+            "cars_filter_latitude": self.get_filter(lat_range),
+            "cars_filter_longitude": self.get_filter(lon_range),
+            "cars_filter_rating": self.get_filter({"rating": "4,5"}),
+            "cars_filter_rating_min": self.get_filter({"rating_min": "4"}),
+            "cars_filter_rating_max": self.get_filter({"rating_max": "3"}),
+            "cars_filter_various": self.get_filter({"various": self.various}),
+            "add_review": self.add_review,
+            "reviews_list": lambda index: self.get_client().get(
+                "/api/v1/reviews/"
+            ),
+            "user_coordinates_update": self.set_user_coordinates,
+        }
+
+        if not self.various:
+            del scenarios["cars_filter_various"]
+        return scenarios
+
+    def add_review(self, index):
+        user = self.get_user(index)
+        return self.get_client(user).post(
+            f"/api/v1/cars/{self.get_car(index)}/add_review/",
+            {"rating": index % 5 + 1, "comment": "Замер производительности."},
+            format="json",
+        )
+
+    def set_user_coordinates(self, index):
+        user = self.get_user(index)
+        return self.get_client(user).post(
+            f"/api/v1/users/{user.pk}/set-user-coordinates/",
+            {
+                "latitude": self.latitude + index % 100 * 1e-4,
+                "longitude": self.longitude,
+            },
+            format="json",
+        )
+
+    def run_scenario(self, request, count, warmup):
+        for index in range(warmup):
+            request(index)
+
+        timings, queries, statuses = [], [], Counter()
+        started = time.perf_counter()
+
+        for index in range(warmup, warmup + count):
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = request(index)
+                timings.append((time.perf_counter() - request_started) * 1000)
+            queries.append(len(captured))
+            statuses[response.status_code] += 1
+
+        elapsed = time.perf_counter() - started
+        percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+
+        return {
+            "requests": count,
+            "p50_ms": round(percentiles[49], 2),
+            "p95_ms": round(percentiles[94], 2),
+            "p99_ms": round(percentiles[98], 2),
+            "mean_ms": round(statistics.mean(timings), 2),
+            "queries_mean": round(statistics.mean(queries), 2),
+            "queries_max": max(queries),
+            "throughput_rps": round(count / elapsed, 1),
+            "errors": sum(
+                total for code, total in statuses.items() if code >= 400
+            ),
+            "statuses": {str(code): total for code, total in statuses.items()},
+        }
+
+    def write_result(self, name, result):
+        line = (
+            f"{name:<28} p50 {result['p50_ms']:>8.2f} мс  "
+            f"p95 {result['p95_ms']:>8.2f} мс  "
+            f"p99 {result['p99_ms']:>8.2f} мс  "
+            f"запросов к БД {result['queries_mean']:>5.1f}  "
+            f"{result['throughput_rps']:>7.1f} rps"
+        )
+
+        if result["errors"]:
+            self.stdout.write(
+                self.style.WARNING(f"{line}  ошибок {result['errors']}")
+            )
+        else:
+            self.stdout.write(line)
+
+    def get_meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "cars": len(self.cars),
+            "users": User.objects.count(),
+            "reviews": Review.objects.count(),
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "cache": options["cache"],
+        }
+
+    def compare(self, report, path):
+        """Печатает изменение p50 и p95 относительно прошлого замера."""
+        try:
+            with open(path, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Не удалось прочитать {path}: {error}")
+
+        self.stdout.write(
+            f"Сравнение с {path} (коммит {baseline['meta'].get('commit')}):"
+        )
+
+        for name, result in report["results"].items():
+            previous = baseline["results"].get(name)
+
+            if not previous:
+                continue
+
+            changes = "  ".join(
+                f"{metric} "
+                f"{self.format_change(previous[metric], result[metric])}"
+                for metric in ("p50_ms", "p95_ms", "queries_mean")
+            )
+            self.stdout.write(f"{name:<28} {changes}")
+
+    @staticmethod
+    def format_change(previous, current):
+        if not previous:
+            return f"{previous} -> {current}"
+        return f"{(current - previous) / previous * 100:+.1f}%"
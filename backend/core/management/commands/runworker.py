@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import claim_next_job, requeue_stale_jobs, run_job
+from core.metrics import get_registry, prometheus_client
+from core.texts import JOB_POLL_INTERVAL
+
+
+class Command(BaseCommand):
+    help = "Запускает воркер очереди фоновых задач."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить все готовые задачи и завершиться.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help="Пауза между опросами пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            help="Порт HTTP-сервера с метриками Prometheus воркера.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+
+        if requeued:
+            self.stdout.write(f"Возвращено в очередь задач: {requeued}.")
+
+        if options["metrics_port"]:
+            self.start_metrics_server(options["metrics_port"])
+
+        self.stdout.write(self.style.SUCCESS("Воркер запущен."))
+
+        try:
+            while True:
+                job = claim_next_job()
+
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+                    continue
+
+                if run_job(job):
+                    self.stdout.write(f"Выполнена задача {job.task}.")
+                else:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"Ошибка в задаче {job.task}, "
+                            f"попытка {job.attempts}."
+                        )
+                    )
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Воркер остановлен."))
+
+    def start_metrics_server(self, port):
+        """
+        Воркер - отдельный процесс, поэтому длительности обработки
+        изображений и отправки писем он отдаёт на своём порту.
+        """
+        if prometheus_client is None:
+            raise CommandError("Для метрик установите prometheus-client.")
+
+        prometheus_client.start_http_server(port, registry=get_registry())
+        self.stdout.write(f"Метрики доступны на порту {port}.")
@@ -0,0 +1,119 @@
+import os
+import time
+from contextlib import contextmanager
+
+from django.db.models import Count
+
+from core.texts import JOB_STATUS_CHOICES
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+if prometheus_client:
+    REQUEST_DURATION = prometheus_client.Histogram(
+        "api_request_duration_seconds",
+        "Время обработки запроса по представлению и методу.",
+        ["view", "method"],
+    )
+    REQUESTS = prometheus_client.Counter(
+        "api_requests",
+        "Запросы по представлению, методу и коду ответа.",
+        ["view", "method", "status"],
+    )
+    REQUEST_QUERIES = prometheus_client.Histogram(
+        "api_request_db_queries",
+        "Количество SQL-запросов на запрос к API.",
+        ["view"],
+        buckets=QUERY_BUCKETS,
+    )
+    IMAGE_PROCESSING_DURATION = prometheus_client.Histogram(
+        "car_image_processing_seconds",
+        "Время построения уменьшенных копий изображения машины.",
+    )
+    EMAIL_SEND_DURATION = prometheus_client.Histogram(
+        "email_send_duration_seconds",
+        "Время отправки письма.",
+    )
+    LIST_CACHE_REQUESTS = prometheus_client.Counter(
+        "list_cache_requests",
+        "Обращения к кешу списков.",
+        ["cache", "result"],
+    )
+else:
+    REQUEST_DURATION = REQUESTS = REQUEST_QUERIES = None
+    IMAGE_PROCESSING_DURATION = EMAIL_SEND_DURATION = None
+    LIST_CACHE_REQUESTS = None
+
+
+@contextmanager
+def observe_duration(histogram, **labels):
+    """Записывает время блока в гистограмму, если метрики доступны."""
+    if histogram is None:
+        yield
+        return
+
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metric = histogram.labels(**labels) if labels else histogram
+        metric.observe(time.perf_counter() - started)
+
+
+def observe_request(view, method, status, duration, queries):
+    REQUEST_DURATION.labels(view, method).observe(duration)
+    REQUESTS.labels(view, method, status).inc()
+    REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def record_list_cache(name, hit):
+    if LIST_CACHE_REQUESTS is not None:
+        LIST_CACHE_REQUESTS.labels(name, "hit" if hit else "miss").inc()
+
+
+class JobQueueCollector:
+    """Размер очереди фоновых задач по статусам, читается при опросе."""
+
+    def collect(self):
+        from core.models import Job
+
+        counts = dict(
+            Job.objects.order_by()
+            .values_list("status")
+            .annotate(count=Count("id"))
+        )
+        family = GaugeMetricFamily(
+            "jobs", "Задачи в очереди по статусам.", labels=["status"]
+        )
+
+        for status, _ in JOB_STATUS_CHOICES:
+            family.add_metric([status], counts.get(status, 0))
+        yield family
+
+
+def get_registry():
+    """
+    Реестр метрик процесса. Под gunicorn с PROMETHEUS_MULTIPROC_DIR
+    метрики всех воркеров собираются из файлов этого каталога.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def generate_metrics():
+    """Метрики в текстовом формате Prometheus."""
+    queue_registry = prometheus_client.CollectorRegistry()
+    queue_registry.register(JobQueueCollector())
+    return prometheus_client.generate_latest(
+        get_registry()
+    ) + prometheus_client.generate_latest(queue_registry)
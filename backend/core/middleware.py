@@ -0,0 +1,149 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.texts import (
+    INSTRUMENTATION_PATHS,
+    SERVER_TIMING_HEADER,
+    SLOW_REQUEST_THRESHOLD_MS,
+)
+
+from .instrumentation import collect_request_metrics
+from .metrics import observe_request, prometheus_client
+
+logger = logging.getLogger("core.requests")
+slow_logger = logging.getLogger("core.slow_requests")
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class MetricsMiddleware:
+    """
+    Метрики Prometheus по каждому запросу: время обработки, код ответа
+    и количество SQL-запросов. Представление определяется по имени
+    маршрута (cars-list, cars-add-review), поэтому число рядов
+    метрик не зависит от идентификаторов в пути.
+
+    Отключается настройкой PROMETHEUS_METRICS или отсутствием
+    prometheus-client.
+    """
+
+    def __init__(self, get_response):
+        if prometheus_client is None or not getattr(
+            settings, "PROMETHEUS_METRICS", True
+        ):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        observe_request(
+            match.url_name if match and match.url_name else "unmatched",
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            queries,
+        )
+        return response
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Замер запросов к API: число SQL-запросов, время SQL, сериализации,
+    рендеринга и общее время.
+
+    Включается настройкой REQUEST_INSTRUMENTATION. Метрики
+    отдаются в заголовке Server-Timing и пишутся строкой JSON
+    в журнал core.requests. Запросы дольше
+    SLOW_REQUEST_THRESHOLD_MS попадают в журнал core.slow_requests
+    вместе с текстом и временем выполненных SQL-запросов, без значений
+    их параметров.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.paths = tuple(
+            getattr(settings, "INSTRUMENTATION_PATHS", INSTRUMENTATION_PATHS)
+        )
+        self.slow_threshold = getattr(
+            settings, "SLOW_REQUEST_THRESHOLD_MS", SLOW_REQUEST_THRESHOLD_MS
+        )
+
+    def __call__(self, request):
+        if not request.path.startswith(self.paths):
+            return self.get_response(request)
+
+        with collect_request_metrics() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.execute_wrapper)
+                )
+            response = self.get_response(request)
+
+        summary = self.get_summary(request, response, metrics)
+        response[SERVER_TIMING_HEADER] = self.get_server_timing(summary)
+        logger.info(json.dumps(summary, ensure_ascii=False))
+
+        if summary["total_ms"] >= self.slow_threshold:
+            summary["sql"] = [
+                {"sql": sql, "ms": to_ms(duration)}
+                for sql, duration in metrics.queries
+            ]
+            slow_logger.warning(
+                json.dumps(summary, ensure_ascii=False, default=str)
+            )
+
+        return response
+
+    def get_summary(self, request, response, metrics):
+        match = request.resolver_match
+        return {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": len(metrics.queries),
+            "sql_ms": to_ms(metrics.sql_time),
+            "serialize_ms": to_ms(metrics.timings["serialize"]),
+            "render_ms": to_ms(metrics.timings["render"]),
+            "total_ms": to_ms(metrics.total_time),
+            # Тело потокового ответа формируется уже после замера.
+            "streaming": response.streaming,
+        }
+
+    @staticmethod
+    def get_server_timing(summary):
+        return ", ".join(
+            [
+                f'db;dur={summary["sql_ms"]};desc="{summary["queries"]} '
+                f'queries"',
+                f"serialize;dur={summary['serialize_ms']}",
+                f"render;dur={summary['render_ms']}",
+                f"total;dur={summary['total_ms']}",
+            ]
+        )
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.texts import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_ERROR,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMATS,
+)
+
+from .export import serialize_chunks, stream_csv, stream_ndjson
+from .renderers import FastJSONRenderer
+
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+
+class FastJSONRendererMixin:
+    """
+    JSON через FastJSONRenderer (orjson) вместо JSONRenderer
+    для представлений с большими ответами.
+
+    Включается настройкой FAST_JSON_RENDERER, остальные
+    представления используют рендереры DRF по умолчанию.
+    """
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+
+        if not getattr(settings, "FAST_JSON_RENDERER", False):
+            return renderers
+
+        return [
+            FastJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+
+class ValuesListMixin:
+    """
+    Список через ValuesSerializer: строки выбираются values()
+    и сериализуются без создания экземпляров моделей.
+    """
+
+    values_serializer_class = None
+
+    def get_values_serializer_class(self):
+        return self.values_serializer_class
+
+    def get_values_ordering(self):
+        """Поля, по которым пагинатор упорядочит строки values()."""
+        paginator = self.paginator
+
+        if paginator is None or not hasattr(paginator, "is_cursor_mode"):
+            return ()
+
+        if not paginator.is_cursor_mode(self.request):
+            return ()
+        return paginator.get_cursor_ordering(self)
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_values_serializer_class()
+
+        if serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = serializer_class.get_values(
+            self.filter_queryset(self.get_queryset()),
+            request,
+            self.get_values_ordering(),
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = serializer_class(
+            queryset if page is None else page,
+            many=True,
+            context=self.get_serializer_context(),
+        )
+
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+
+class ExportMixin:
+    """
+    Потоковая выгрузка всей отфильтрованной таблицы в NDJSON или CSV.
+
+    Без пагинации и COUNT(*): строки читаются курсором частями
+    и сразу отдаются клиенту, поэтому расход памяти не зависит
+    от размера таблицы. Использует values_serializer_class
+    и те же фильтры, что и список.
+    """
+
+    export_format_param = "file_format"
+    export_filename = "export"
+
+    def get_export_format(self):
+        export_format = self.request.query_params.get(
+            self.export_format_param, EXPORT_FORMAT_NDJSON
+        )
+
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {
+                    self.export_format_param: EXPORT_FORMAT_ERROR.format(
+                        formats=", ".join(EXPORT_FORMATS)
+                    )
+                }
+            )
+        return export_format
+
+    @action(detail=False, methods=["GET"])
+    def export(self, request):
+        export_format = self.get_export_format()
+        serializer_class = self.get_values_serializer_class()
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = serializer_class.get_values(
+            queryset.order_by(queryset.model._meta.pk.name), request
+        )
+        chunks = serialize_chunks(
+            queryset, serializer_class, self.get_serializer_context()
+        )
+
+        if export_format == EXPORT_FORMAT_CSV:
+            content = stream_csv(
+                chunks,
+                serializer_class.get_fields(request),
+                serializer_class.csv_expanded,
+            )
+        else:
+            content = stream_ndjson(chunks)
+
+        response = StreamingHttpResponse(
+            content, content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.export_filename}.{export_format}"'
+        )
+        return response
@@ -0,0 +1,91 @@
+from django.db import models
+from django.utils import timezone
+
+from core.texts import (
+    JOB_ATTEMPTS_LABEL,
+    JOB_CREATED_AT_LABEL,
+    JOB_KWARGS_LABEL,
+    JOB_LAST_ERROR_LABEL,
+    JOB_MAX_ATTEMPTS,
+    JOB_MAX_ATTEMPTS_LABEL,
+    JOB_RUN_AT_LABEL,
+    JOB_STATUS_CHOICES,
+    JOB_STATUS_LABEL,
+    JOB_STATUS_PENDING,
+    JOB_TASK_LABEL,
+    JOB_UPDATED_AT_LABEL,
+    JOB_VERBOSE_NAME,
+    JOB_VERBOSE_NAME_PLURAL,
+    TABLE_VERSION_TABLE_LABEL,
+    TABLE_VERSION_VERBOSE_NAME,
+    TABLE_VERSION_VERBOSE_NAME_PLURAL,
+    TABLE_VERSION_VERSION_LABEL,
+)
+
+
+class Job(models.Model):
+    """
+    Фоновая задача, хранящаяся в базе.
+
+    Задача - это импортируемая функция (task) и её именованные
+    аргументы (kwargs). Выполненные задачи удаляются, исчерпавшие
+    попытки остаются со статусом dead.
+    """
+
+    task = models.CharField(JOB_TASK_LABEL, max_length=200)
+    kwargs = models.JSONField(JOB_KWARGS_LABEL, default=dict, blank=True)
+    status = models.CharField(
+        JOB_STATUS_LABEL,
+        choices=JOB_STATUS_CHOICES,
+        default=JOB_STATUS_PENDING,
+        max_length=10,
+    )
+    attempts = models.PositiveIntegerField(JOB_ATTEMPTS_LABEL, default=0)
+    max_attempts = models.PositiveIntegerField(
+        JOB_MAX_ATTEMPTS_LABEL,
+        default=JOB_MAX_ATTEMPTS,
+    )
+    run_at = models.DateTimeField(JOB_RUN_AT_LABEL, default=timezone.now)
+    last_error = models.TextField(JOB_LAST_ERROR_LABEL, blank=True)
+    created_at = models.DateTimeField(JOB_CREATED_AT_LABEL, auto_now_add=True)
+    updated_at = models.DateTimeField(JOB_UPDATED_AT_LABEL, auto_now=True)
+
+    class Meta:
+        verbose_name = JOB_VERBOSE_NAME
+        verbose_name_plural = JOB_VERBOSE_NAME_PLURAL
+        indexes = [
+            models.Index(
+                fields=["status", "run_at"],
+                name="job_status_run_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
+
+
+class TableVersion(models.Model):
+    """
+    Счётчик изменений таблицы.
+
+    Увеличивается при каждом изменении отслеживаемой модели
+    и входит в ключи кеша, поэтому после изменения данных
+    закешированные ответы перестают находиться во всех процессах.
+    """
+
+    table = models.CharField(
+        TABLE_VERSION_TABLE_LABEL,
+        max_length=100,
+        unique=True,
+    )
+    version = models.PositiveBigIntegerField(
+        TABLE_VERSION_VERSION_LABEL,
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = TABLE_VERSION_VERBOSE_NAME
+        verbose_name_plural = TABLE_VERSION_VERBOSE_NAME_PLURAL
+
+    def __str__(self):
+        return f"{self.table}: {self.version}"
@@ -0,0 +1,110 @@
+from functools import partial
+
+from django.core.paginator import Paginator
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class WindowPaginator(Paginator):
+    """
+    Paginator, который считает количество объектов по полному списку,
+    а страницы вырезает из окна - его части, заведомо содержащей
+    в том же порядке все объекты до запрошенной страницы включительно.
+    """
+
+    def __init__(self, object_list, per_page, window=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.window = object_list if window is None else window
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(self.window[bottom:top], number, self)
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с курсорным режимом по запросу.
+
+    По умолчанию работает как PageNumberPagination. С параметром
+    ?pagination=cursor переключается на CursorPagination, которая
+    не считает COUNT(*) и не использует OFFSET, поэтому время выборки
+    страницы не зависит от её глубины. Порядок курсора задаётся методом
+    представления get_cursor_ordering() или атрибутом cursor_ordering.
+
+    В постраничном режиме представление может вернуть из
+    get_page_window(queryset) окно, из которого берётся страница;
+    количество объектов при этом считается по всему queryset.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_ordering = ("id",)
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        """Запрошен ли курсорный режим пагинации."""
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+        )
+
+    def get_cursor_ordering(self, view):
+        if hasattr(view, "get_cursor_ordering"):
+            return view.get_cursor_ordering()
+        return getattr(view, "cursor_ordering", self.cursor_ordering)
+
+    def get_cursor_paginator(self, view):
+        paginator = CursorPagination()
+        paginator.page_size = self.page_size
+        paginator.ordering = self.get_cursor_ordering(view)
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = self.get_cursor_paginator(view)
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        if hasattr(view, "get_page_window"):
+            window = view.get_page_window(queryset)
+
+            if window is not None:
+                self.django_paginator_class = partial(
+                    WindowPaginator, window=window
+                )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        return parameters + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Режим пагинации: cursor для курсорной.",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+            {
+                "name": CursorPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": CursorPagination.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,54 @@
+from rest_framework.renderers import JSONRenderer
+
+from .instrumentation import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson.
+
+    Выдаёт тот же JSON, что и JSONRenderer, но в несколько раз быстрее
+    на больших страницах. Если orjson не установлен или клиент
+    запросил отступы (application/json; indent=4), работает
+    как обычный JSONRenderer.
+    """
+
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson
+        else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return timed(
+            "render",
+            self.render_json,
+            data,
+            accepted_media_type,
+            renderer_context,
+        )
+
+    def render_json(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+
+        if orjson is None or indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=self.options,
+        )
+        # Как и JSONRenderer, экранируем U+2028 и U+2029,
+        # чтобы ответ оставался корректным JavaScript.
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,165 @@
+from operator import itemgetter
+
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.permissions import SAFE_METHODS
+
+from core.texts import EXPORT_FORMATS
+
+from .instrumentation import timed
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        "file_format",
+        str,
+        enum=EXPORT_FORMATS,
+        description="Формат выгрузки, по умолчанию ndjson.",
+    ),
+]
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        FIELDS_PARAM,
+        str,
+        description="Только перечисленные через запятую поля.",
+    ),
+    OpenApiParameter(
+        OMIT_PARAM,
+        str,
+        description="Все поля, кроме перечисленных через запятую.",
+    ),
+]
+
+
+def split_param(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+def get_sparse_fields(request, available):
+    """
+    Поля ответа с учётом параметров ?fields= и ?omit=.
+
+    fields оставляет только перечисленные поля, omit убирает
+    перечисленные. Неизвестные имена игнорируются. Параметры
+    действуют только на чтение, чтобы не ломать проверку входных данных.
+    """
+    available = list(available)
+
+    if request is None or request.method not in SAFE_METHODS:
+        return available
+
+    query_params = getattr(request, "query_params", request.GET)
+    fields = split_param(query_params.get(FIELDS_PARAM))
+    omit = split_param(query_params.get(OMIT_PARAM))
+
+    return [
+        name
+        for name in available
+        if (not fields or name in fields) and name not in omit
+    ]
+
+
+def get_ordering_fields(ordering):
+    """Имена полей из выражения сортировки вида ("-created_at", "id")."""
+    return [
+        field.lstrip("-")
+        for field in ordering
+        if isinstance(field, str) and field != "?"
+    ]
+
+
+class SparseFieldsMixin:
+    """
+    Поддержка ?fields= и ?omit= в сериализаторе.
+
+    Работает только для сериализатора верхнего уровня: вложенные
+    сериализаторы создаются без контекста запроса.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = set(
+            get_sparse_fields(self.context.get("request"), self.fields)
+        )
+
+        for name in list(self.fields):
+            if name not in requested:
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        return timed("serialize", super().to_representation, instance)
+
+
+class ValuesSerializer:
+    """
+    Сериализатор только для чтения, работающий со строками
+    QuerySet.values().
+
+    Не создаёт ни экземпляры моделей, ни поля DRF, поэтому подходит
+    для больших страниц списков. Представление строки должно
+    совпадать с ответом основного сериализатора.
+
+    values сопоставляет поле ответа со столбцами values(), нужными
+    для него. Поле без метода get_<поле> берётся из одноимённого
+    столбца. Выбираются только столбцы запрошенных полей.
+    """
+
+    values = {}
+    csv_expanded = {}
+    "Поля-словари, раскладываемые при выгрузке в CSV по столбцам"
+
+    def __init__(self, instance, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.fields = self.get_fields(self.context.get("request"))
+
+    @classmethod
+    def get_fields(cls, request):
+        return get_sparse_fields(request, cls.values)
+
+    @classmethod
+    def get_values(cls, queryset, request=None, ordering=()):
+        """
+        Строки queryset со столбцами запрошенных полей.
+
+        Первичный ключ, аннотации и поля сортировки (queryset и ordering,
+        например порядок курсорной пагинации) выбираются всегда:
+        первый нужен для догрузки связей, по остальным курсор строит
+        позицию следующей страницы. В ответ попадают только
+        запрошенные поля.
+        """
+        columns = {queryset.model._meta.pk.attname: None}
+
+        for name in cls.get_fields(request):
+            columns.update(dict.fromkeys(cls.values[name]))
+
+        columns.update(dict.fromkeys(queryset.query.annotations))
+        columns.update(
+            dict.fromkeys(
+                get_ordering_fields((*queryset.query.order_by, *ordering))
+            )
+        )
+        return queryset.prefetch_related(None).values(*columns)
+
+    def prepare(self, rows):
+        """Догружает связанные данные сразу для всех строк."""
+        return rows
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    @property
+    def data(self):
+        return timed("serialize", self.serialize)
+
+    def serialize(self):
+        self.getters = [
+            (name, getattr(self, f"get_{name}", None) or itemgetter(name))
+            for name in self.fields
+        ]
+
+        if self.many:
+            rows = self.prepare(list(self.instance))
+            return [self.to_representation(row) for row in rows]
+        return self.to_representation(self.prepare([self.instance])[0])
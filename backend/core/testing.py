@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Проверка количества SQL-запросов на запрос к API.
+
+    Бюджет задаёт верхнюю границу: запрос может стать дешевле,
+    но не дороже. Кеш очищается перед каждым тестом, чтобы
+    закешированная страница не скрывала запросы к базе.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def assertQueryBudget(self, budget, url, method="get", **kwargs):
+        """Выполняет запрос и проверяет, что он уложился в budget."""
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+
+        self.assertLess(response.status_code, 400, response.content)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return response
@@ -7,9 +7,109 @@ MIN_NAME_SURNAME_LENGTH = 1
 MAX_NAME_SURNAME_LENGTH = 50
 MIN_LENGTH_EMAIL = 7
 
+# ПАРАМЕТРЫ ОЧЕРЕДИ ЗАДАЧ.
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 10
+"Задержка перед первым повтором задачи, в секундах; далее удваивается"
+JOB_STALE_TIMEOUT = 600
+"Через сколько секунд зависшая задача возвращается в очередь"
+JOB_POLL_INTERVAL = 1.0
+
 # ПАРАМЕТРЫ ИЗОБРАЖЕНИЯ.
 TARGET_IMAGE_SIZE = (200, 120)
 "Пропорция сохраняемой картинки"
+IMAGE_VARIANTS = {
+    "marker": (64, 38),
+    "list": TARGET_IMAGE_SIZE,
+    "detail": (800, 480),
+}
+"Размеры уменьшенных копий изображения машины"
+IMAGE_QUALITY = 80
+IMAGE_UPLOAD_DIR = "cars/images/"
+"Каталог изображений машин, адресуемых по содержимому"
+IMAGE_SWEEP_GRACE = 3600
+"Файлы моложе этого возраста (в секундах) не удаляются при очистке"
+CAR_DEFAULT_IMAGE = "default_image/default_car.png"
+"Изображение машины по умолчанию, хранится в репозитории"
+CAR_DEFAULT_IMAGE_VARIANTS_DIR = "default_image_variants/"
+"Каталог копий изображения по умолчанию, их строит build_image_variants"
+
+# ПАРАМЕТРЫ ПРОСТРАНСТВЕННОЙ СЕТКИ.
+GRID_CELL_SIZE = 0.01
+"Размер ячейки сетки координат в градусах (~1 км)"
+
+# ПАРАМЕТРЫ ПОИСКА БЛИЖАЙШИХ МАШИН.
+NEAREST_DEFAULT_K = 10
+NEAREST_MAX_K = 100
+NEAREST_INDEX_TTL = 60
+"Время жизни индекса ближайших машин в памяти процесса, в секундах"
+
+# ПАРАМЕТРЫ КЛАСТЕРИЗАЦИИ МАШИН НА КАРТЕ.
+CLUSTER_MAX_ZOOM = 20
+CLUSTER_CELLS_PER_TILE = 8
+"Количество кластеров по стороне тайла карты"
+CLUSTER_PRECOMPUTED_MAX_ZOOM = 8
+"До этого масштаба кластеры строятся сразу для всей карты и кешируются"
+CLUSTER_CACHE_TIMEOUT = 30
+"Время жизни кластеров, построенных для всей карты, в секундах"
+CLUSTER_MAX_BBOX_TILES = 8
+"Наибольшая сторона области кластеризации, в тайлах её масштаба"
+CLUSTER_BBOX_HELP_TEXT = "Границы области: min_lon,min_lat,max_lon,max_lat"
+CLUSTER_BBOX_NOT_NUMBERS = "Границы области должны быть числами."
+CLUSTER_BBOX_FORMAT = (
+    "Укажите границы области в формате min_lon,min_lat,max_lon,max_lat."
+)
+CLUSTER_BBOX_OUT_OF_RANGE = "Границы области вне допустимого диапазона."
+CLUSTER_BBOX_TOO_LARGE = (
+    "На масштабе {zoom} сторона области должна быть "
+    "не больше {max_size:g}°."
+)
+
+# ПАРАМЕТРЫ ТАЙЛОВ КАРТЫ.
+TILE_MIN_ZOOM = 10
+TILE_MAX_ZOOM = 20
+TILE_CACHE_TIMEOUT = 60
+"Время жизни тайла в кэше, в секундах"
+TILE_ZOOM_ERROR = "Тайлы доступны для масштабов от {min_zoom} до {max_zoom}."
+TILE_NOT_FOUND = "Тайл с такими координатами не существует."
+
+# ПАРАМЕТРЫ КЕШИРОВАНИЯ СПИСКОВ.
+LIST_CACHE_TIMEOUT = 300
+"Время жизни закешированной страницы списка, в секундах"
+CACHE_HEADER = "X-Cache"
+
+# ПАРАМЕТРЫ ТЕЛЕМЕТРИИ.
+TELEMETRY_MAX_ROWS = 10000
+TELEMETRY_BATCH_SIZE = 1000
+TELEMETRY_CAR_NOT_FOUND = "Машина не найдена."
+TELEMETRY_NOT_A_LIST = "Ожидается список записей телеметрии."
+TELEMETRY_TOO_MANY_ROWS = "Не более {max_rows} записей за один запрос."
+
+# ПАРАМЕТРЫ ЗАГРУЗКИ ДАННЫХ.
+FIXTURES_BATCH_SIZE = 5000
+"Количество записей, сохраняемых одним bulk_create"
+FIXTURES_UNKNOWN_VARIOUS = "Неизвестное значение various: {slug}."
+FIXTURES_UNKNOWN_FORMAT = "Неизвестный формат файла: {path}."
+FIXTURES_NOT_AN_ARRAY = "Ожидается JSON-массив записей."
+FIXTURES_UNSUPPORTED_MODEL = (
+    "Модель {model} не поддерживается загрузчиком машин: "
+    "загрузите эти записи командой loaddata."
+)
+
+# ПАРАМЕТРЫ ВЫГРУЗКИ.
+EXPORT_CHUNK_SIZE = 2000
+"Количество строк, читаемых из курсора и сериализуемых за раз"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMATS = (EXPORT_FORMAT_NDJSON, EXPORT_FORMAT_CSV)
+EXPORT_FORMAT_ERROR = "Формат выгрузки должен быть одним из: {formats}."
+
+# ПАРАМЕТРЫ ЗАМЕРА ЗАПРОСОВ.
+INSTRUMENTATION_PATHS = ("/api/",)
+"Префиксы путей, запросы к которым замеряются"
+SLOW_REQUEST_THRESHOLD_MS = 500
+"Запросы дольше этого времени, в мс, пишутся в журнал медленных"
+SERVER_TIMING_HEADER = "Server-Timing"
 
 
 # Тексты для модели Users
@@ -32,9 +132,11 @@ USER_ERROR_DELETE_ACCOUNT = "Вы можете удалить только св
 USER_SUCCESS_DELETE_ACCOUNT = "Пользователь успешно удален"
 USER_ERROR_DELETE = "Ошибка при удалении пользователя"
 
-# Тексты для модели CoordinatesCar
+# Тексты для координат
 HELP_TEXT_LATITUDE = "Допустимый диапазон: -90.0 до 90.0"
 HELP_TEXT_LONGITUDE = "Допустимый диапазон: -180.0 до 180.0"
+CELL_LATITUDE_LABEL = "Ячейка сетки по широте"
+CELL_LONGITUDE_LABEL = "Ячейка сетки по долготе"
 
 
 # Тексты для модели Car
@@ -47,12 +149,14 @@ CAR_MODEL_LABEL = "Модель"
 CAR_TYPE_LABEL = "Тип"
 CAR_STATE_NUMBER_LABEL = "Госномер"
 CAR_STATE_NUMBER_VALIDATOR_MESSAGE = "Неверный формат госномера"
+CAR_STATE_NUMBER_EXISTS = "Автомобиль с таким номером уже существует."
 CAR_ENGINE_TYPE_LABEL = "Тип двигателя"
 CAR_POWER_RESERVE_LABEL = "Запас хода"
 CAR_RATING_LABEL = "Рейтинг автомобиля"
-CAR_COORDINATES_LABEL = "Координаты автомобиля"
-CAR_COORDINATES_HELP_TEXT = "Укажите координаты автомобиля"
+CAR_RATING_SUM_LABEL = "Сумма оценок"
+CAR_RATING_COUNT_LABEL = "Количество оценок"
 CAR_VARIOUS_LABEL = "Разное"
+CAR_IMAGE_VARIANTS_LABEL = "Уменьшенные копии изображения"
 
 CAR_VERBOSE_NAME = "Автомобиль"
 CAR_VERBOSE_NAME_PLURAL = "Автомобили"
@@ -101,6 +205,43 @@ CAR_VARIOUS_CHOICES = [
 ]
 
 
+# Тексты для модели StoredImage
+STORED_IMAGE_VERBOSE_NAME = "Изображение"
+STORED_IMAGE_VERBOSE_NAME_PLURAL = "Изображения"
+STORED_IMAGE_NAME_LABEL = "Файл"
+STORED_IMAGE_REF_COUNT_LABEL = "Число ссылок"
+STORED_IMAGE_VARIANTS_LABEL = "Уменьшенные копии"
+
+
+# Тексты для модели TableVersion
+TABLE_VERSION_VERBOSE_NAME = "Версия таблицы"
+TABLE_VERSION_VERBOSE_NAME_PLURAL = "Версии таблиц"
+TABLE_VERSION_TABLE_LABEL = "Таблица"
+TABLE_VERSION_VERSION_LABEL = "Версия"
+
+# Тексты для модели Job
+JOB_VERBOSE_NAME = "Фоновая задача"
+JOB_VERBOSE_NAME_PLURAL = "Фоновые задачи"
+JOB_TASK_LABEL = "Задача"
+JOB_KWARGS_LABEL = "Аргументы"
+JOB_STATUS_LABEL = "Статус"
+JOB_ATTEMPTS_LABEL = "Попыток"
+JOB_MAX_ATTEMPTS_LABEL = "Максимум попыток"
+JOB_RUN_AT_LABEL = "Запуск не раньше"
+JOB_LAST_ERROR_LABEL = "Последняя ошибка"
+JOB_CREATED_AT_LABEL = "Создана"
+JOB_UPDATED_AT_LABEL = "Обновлена"
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_DEAD = "dead"
+JOB_STATUS_CHOICES = [
+    (JOB_STATUS_PENDING, "В очереди"),
+    (JOB_STATUS_RUNNING, "Выполняется"),
+    (JOB_STATUS_DEAD, "Не выполнена"),
+]
+
+
 # Тексты для модели Review
 
 REVIEW_VERBOSE_NAME = "Отзыв"
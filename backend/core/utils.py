@@ -3,6 +3,7 @@ import random
 from django.conf import settings
 from django.core.mail import send_mail
 
+from core.metrics import EMAIL_SEND_DURATION, observe_duration
 from core.texts import USER_RESET_CODE_LEN
 
 
@@ -13,7 +14,9 @@ def send_confirmation_code(email, code):
     message = f"Ваш временный код для сброса пароля: {code}"
     from_email = settings.DEFAULT_FROM_EMAIL
     recipient_list = [email]
-    send_mail(subject, message, from_email, recipient_list)
+
+    with observe_duration(EMAIL_SEND_DURATION):
+        send_mail(subject, message, from_email, recipient_list)
 
 
 def generate_reset_code():
@@ -0,0 +1,122 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import TableVersion
+
+M2M_CHANGE_ACTIONS = {"post_add", "post_remove", "post_clear"}
+
+
+def get_table_label(model):
+    return model._meta.label_lower
+
+
+def get_table_versions(*models):
+    """Текущие версии таблиц моделей одним запросом, в порядке моделей."""
+    labels = [get_table_label(model) for model in models]
+    versions = dict(
+        TableVersion.objects.filter(table__in=labels).values_list(
+            "table", "version"
+        )
+    )
+    return tuple(versions.get(label, 0) for label in labels)
+
+
+class PendingTableVersions:
+    """
+    Таблицы, версии которых нужно увеличить после фиксации транзакции.
+
+    Экземпляр регистрируется в transaction.on_commit один раз
+    на транзакцию и собирает метки таблиц без повторов.
+    """
+
+    def __init__(self):
+        self.tables = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        increment_table_versions(self.tables)
+
+
+def increment_table_versions(tables):
+    """Увеличивает версии таблиц, создавая недостающие строки."""
+    for table in sorted(tables):
+        versions = TableVersion.objects.filter(table=table)
+
+        if versions.update(version=F("version") + 1):
+            continue
+
+        _, created = TableVersion.objects.get_or_create(
+            table=table, defaults={"version": 1}
+        )
+
+        if not created:
+            versions.update(version=F("version") + 1)
+
+
+def get_pending_table_versions(connection):
+    """Накопитель текущей транзакции, при необходимости новый."""
+    pending = getattr(connection, "pending_table_versions", None)
+
+    if pending is None or pending.done or not any(
+        callback[1] is pending for callback in connection.run_on_commit
+    ):
+        pending = connection.pending_table_versions = PendingTableVersions()
+        transaction.on_commit(pending)
+
+    return pending
+
+
+def bump_table_version(*models):
+    """
+    Увеличивает версии таблиц моделей после фиксации транзакции.
+
+    Каждая таблица увеличивается один раз на транзакцию, сколько бы
+    строк в ней ни сохранялось, поэтому пишущие транзакции не ждут
+    друг друга на строке версии. Вне транзакции версии
+    увеличиваются сразу.
+    """
+    tables = {get_table_label(model) for model in models}
+    connection = transaction.get_connection()
+
+    if not connection.in_atomic_block:
+        increment_table_versions(tables)
+        return
+
+    get_pending_table_versions(connection).tables.update(tables)
+
+
+def bump_on_save_or_delete(sender, **kwargs):
+    bump_table_version(sender)
+
+
+def bump_on_m2m_change(sender, action, **kwargs):
+    if action in M2M_CHANGE_ACTIONS:
+        bump_table_version(sender)
+
+
+def track_table_versions(*models):
+    """
+    Подключает увеличение версий таблиц к сигналам моделей.
+
+    Для промежуточной модели связи многие-ко-многим версия
+    увеличивается при изменении связей. Изменения через
+    QuerySet.update и bulk_update сигналов не посылают,
+    для них нужно вызывать bump_table_version явно.
+    """
+    for model in models:
+        uid = f"table_version:{get_table_label(model)}"
+
+        if model._meta.auto_created:
+            m2m_changed.connect(
+                bump_on_m2m_change, sender=model, dispatch_uid=uid
+            )
+            continue
+
+        post_save.connect(
+            bump_on_save_or_delete, sender=model, dispatch_uid=uid
+        )
+        post_delete.connect(
+            bump_on_save_or_delete, sender=model, dispatch_uid=uid
+        )
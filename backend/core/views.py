@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .metrics import generate_metrics, prometheus_client
+
+
+def metrics(request):
+    """Метрики для Prometheus."""
+    if prometheus_client is None or not getattr(
+        settings, "PROMETHEUS_METRICS", True
+    ):
+        raise Http404
+
+    return HttpResponse(
+        generate_metrics(), content_type=prometheus_client.CONTENT_TYPE_LATEST
+    )
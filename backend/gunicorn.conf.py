@@ -0,0 +1,22 @@
+import os
+import shutil
+
+bind = "0.0.0.0:8000"
+
+# Каждый воркер пишет метрики Prometheus в файлы этого каталога,
+# /metrics складывает их. Каталог задаётся до загрузки приложения.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-metrics"
+)
+
+
+def on_starting(server):
+    """Очищает метрики прошлого запуска."""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
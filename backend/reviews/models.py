@@ -13,7 +13,7 @@ from core.texts import (
     REVIEW_VERBOSE_NAME,
     REVIEW_VERBOSE_NAME_PLURAL,
 )
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 
 
@@ -51,6 +51,20 @@ class Review(models.Model):
     class Meta:
         verbose_name = REVIEW_VERBOSE_NAME
         verbose_name_plural = REVIEW_VERBOSE_NAME_PLURAL
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                name="review_created_at_id_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет отзыв в одной транзакции с обновлением
+        агрегатов рейтинга машины.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return (
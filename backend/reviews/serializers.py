@@ -1,10 +1,13 @@
+from django.utils import timezone
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsMixin, ValuesSerializer
+
 from .models import Review
 from .utils import validate_raiting
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Review."""
     created_at = serializers.DateTimeField(format="%d.%m.%Y", read_only=True)  # Задаем формат даты
     rating = serializers.FloatField(validators=[validate_raiting])
@@ -21,6 +24,36 @@ class ReviewSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReviewValuesSerializer(ValuesSerializer):
+    """
+    Быстрая сериализация списка отзывов из values().
+    Ответ совпадает с ReviewSerializer.
+    """
+
+    values = {
+        "id": ("id",),
+        "user": ("user_id",),
+        "car": ("car_id",),
+        "rating": ("rating",),
+        "comment": ("comment",),
+        "created_at": ("created_at",),
+    }
+
+    def get_user(self, row):
+        return row["user_id"]
+
+    def get_car(self, row):
+        return row["car_id"]
+
+    def get_rating(self, row):
+        return float(row["rating"])
+
+    def get_created_at(self, row):
+        if row["created_at"] is None:
+            return None
+        return timezone.localtime(row["created_at"]).strftime("%d.%m.%Y")
+
+
 class AddReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для создания отзыва."""
 
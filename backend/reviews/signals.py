@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from cars.models import Car
+from core.versions import track_table_versions
+
+from .models import Review
+
+
+def get_stored_rating(review):
+    """
+    Машина и оценка отзыва в базе. Строка блокируется до конца
+    транзакции, поэтому параллельные изменения одного отзыва
+    не применят к агрегатам одну и ту же разницу дважды.
+    """
+    return (
+        Review.objects.select_for_update()
+        .filter(pk=review.pk)
+        .values_list("car_id", "rating")
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    """Запоминает машину и оценку отзыва до его изменения."""
+    instance._previous_rating = None
+
+    if instance.pk is not None:
+        instance._previous_rating = get_stored_rating(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_car_rating_on_save(sender, instance, **kwargs):
+    """Обновляет агрегаты рейтинга машины после сохранения отзыва."""
+    rating = Decimal(str(instance.rating))
+    previous = getattr(instance, "_previous_rating", None)
+
+    if previous is None:
+        Car.objects.filter(pk=instance.car_id).add_rating(rating, 1)
+        return
+
+    previous_car_id, previous_rating = previous
+
+    if previous_car_id == instance.car_id:
+        Car.objects.filter(pk=instance.car_id).add_rating(
+            rating - previous_rating, 0
+        )
+    else:
+        Car.objects.filter(pk=previous_car_id).add_rating(
+            -previous_rating, -1
+        )
+        Car.objects.filter(pk=instance.car_id).add_rating(rating, 1)
+
+
+@receiver(pre_delete, sender=Review)
+def remember_deleted_rating(sender, instance, **kwargs):
+    """Запоминает машину и оценку удаляемого отзыва из базы."""
+    instance._previous_rating = get_stored_rating(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_car_rating_on_delete(sender, instance, **kwargs):
+    """Обновляет агрегаты рейтинга машины после удаления отзыва."""
+    previous = getattr(instance, "_previous_rating", None)
+
+    if previous is None:
+        # Отзыв уже удалён параллельно, агрегаты изменены там.
+        return
+
+    car_id, rating = previous
+    Car.objects.filter(pk=car_id).add_rating(-Decimal(str(rating)), -1)
+
+
+track_table_versions(Review)
@@ -0,0 +1,240 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from cars.models import Car
+from cars.tests import create_cars, create_user
+from core.pagination import CursorOptInPagination
+from core.testing import QueryBudgetMixin
+
+from .models import Review
+from .serializers import ReviewSerializer, ReviewValuesSerializer
+
+
+class ReviewQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Список и карточка отзыва выбираются фиксированным числом запросов."""
+
+    LIST_BUDGET = 3
+    DETAIL_BUDGET = 2
+    ADD_REVIEW_BUDGET = 13
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cars = create_cars(5)
+        cls.users = [
+            create_user(email=f"driver{index}@example.com")
+            for index in range(4)
+        ]
+
+    def add_reviews(self, users):
+        for user in users:
+            for car in self.cars:
+                Review.objects.create(user=user, car=car, rating=4)
+
+    def test_list(self):
+        self.add_reviews(self.users[:1])
+        self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/reviews/")
+        self.add_reviews(self.users[1:])
+        response = self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/reviews/")
+        self.assertEqual(response.data["count"], 20)
+
+    def test_list_cursor(self):
+        self.add_reviews(self.users)
+        self.assertQueryBudget(
+            self.LIST_BUDGET, "/api/v1/reviews/?pagination=cursor"
+        )
+
+    def test_detail(self):
+        self.add_reviews(self.users[:1])
+        review = Review.objects.first()
+        self.assertQueryBudget(
+            self.DETAIL_BUDGET, f"/api/v1/reviews/{review.id}/"
+        )
+
+    def test_add_review(self):
+        self.client.force_authenticate(self.users[0])
+        self.assertQueryBudget(
+            self.ADD_REVIEW_BUDGET,
+            f"/api/v1/cars/{self.cars[0].id}/add_review/",
+            method="post",
+            data={"rating": 5, "comment": "Чистая машина"},
+            format="json",
+        )
+
+
+@mock.patch.object(CursorOptInPagination, "page_size", 2)
+class ReviewCursorSparseFieldsTests(APITestCase):
+    """
+    ?fields= и ?omit= не мешают курсорной пагинации: поля сортировки
+    курсора выбираются, даже если их нет в ответе.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_user()
+        cls.reviews = [
+            Review.objects.create(user=user, car=car, rating=5)
+            for car in create_cars(5)
+        ]
+
+    def get_all_pages(self, url):
+        ids = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            ids.extend(review["id"] for review in response.data["results"])
+            url = response.data["next"]
+
+        return ids, response.data["results"][-1]
+
+    def test_fields(self):
+        ids, last = self.get_all_pages(
+            "/api/v1/reviews/?pagination=cursor&fields=id"
+        )
+        self.assertEqual(ids, [review.id for review in self.reviews])
+        self.assertEqual(list(last), ["id"])
+
+    def test_omit_ordering_field(self):
+        ids, last = self.get_all_pages(
+            "/api/v1/reviews/?pagination=cursor&omit=created_at"
+        )
+        self.assertEqual(ids, [review.id for review in self.reviews])
+        self.assertNotIn("created_at", last)
+
+
+class ReviewValuesSerializerTests(APITestCase):
+    """Список и карточка отзыва отдают отзыв одинаково."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.review = Review.objects.create(
+            user=create_user(),
+            car=create_cars(1)[0],
+            rating=4.5,
+            comment="Чистая машина",
+        )
+
+    def test_fields_match(self):
+        self.assertEqual(
+            list(ReviewValuesSerializer.values), ReviewSerializer.Meta.fields
+        )
+
+    def test_list_matches_detail(self):
+        listed = self.client.get("/api/v1/reviews/")
+        detail = self.client.get(f"/api/v1/reviews/{self.review.id}/")
+
+        self.assertEqual(listed.json()["results"], [detail.json()])
+
+
+class ReviewETagTests(APITestCase):
+    """Условный GET списка и карточки отзыва."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.car = create_cars(1)[0]
+            cls.user = create_user()
+            cls.review = Review.objects.create(
+                user=cls.user, car=cls.car, rating=4
+            )
+
+    def test_not_modified(self):
+        for url in ("/api/v1/reviews/", f"/api/v1/reviews/{self.review.id}/"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+
+    def test_review_write_changes_etag(self):
+        url = "/api/v1/reviews/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review.comment = "Чистая машина"
+            self.review.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class CarRatingAggregateTests(TestCase):
+    """Агрегаты рейтинга машины следуют за отзывами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.car, cls.other_car = create_cars(2)
+        cls.users = [
+            create_user(email=f"driver{index}@example.com")
+            for index in range(2)
+        ]
+
+    def assertRating(self, car, rating_sum, rating_count):
+        car = Car.objects.get(pk=car.pk)
+        self.assertEqual(
+            (car.rating_sum, car.rating_count), (rating_sum, rating_count)
+        )
+        self.assertAlmostEqual(
+            car.rating_avg, rating_sum / rating_count if rating_count else 0
+        )
+
+    def create_review(self, user, rating, car=None):
+        return Review.objects.create(
+            user=user, car=car or self.car, rating=rating
+        )
+
+    def test_create(self):
+        self.create_review(self.users[0], 5)
+        self.create_review(self.users[1], 2)
+
+        self.assertRating(self.car, 7, 2)
+
+    def test_edit(self):
+        review = self.create_review(self.users[0], 5)
+        review.rating = 3
+        review.save()
+
+        self.assertRating(self.car, 3, 1)
+
+    def test_edit_stale_instance(self):
+        review = self.create_review(self.users[0], 5)
+        stale = Review.objects.get(pk=review.pk)
+        review.rating = 3
+        review.save()
+        stale.rating = 4
+        stale.save()
+
+        self.assertRating(self.car, 4, 1)
+
+    def test_delete(self):
+        review = self.create_review(self.users[0], 5)
+        self.create_review(self.users[1], 2)
+        stale = Review.objects.get(pk=review.pk)
+        review.rating = 1
+        review.save()
+        stale.delete()
+
+        self.assertRating(self.car, 2, 1)
+
+    def test_delete_queryset(self):
+        self.create_review(self.users[0], 5)
+        self.create_review(self.users[1], 2)
+        Review.objects.all().delete()
+
+        self.assertRating(self.car, 0, 0)
+
+    def test_move_to_other_car(self):
+        review = self.create_review(self.users[0], 5)
+        self.create_review(self.users[1], 3)
+        review.car = self.other_car
+        review.rating = 4
+        review.save()
+
+        self.assertRating(self.car, 3, 1)
+        self.assertRating(self.other_car, 4, 1)
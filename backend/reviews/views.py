@@ -2,12 +2,16 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.viewsets import ModelViewSet
 
+from core.caching import ETagMixin
+from core.mixins import ExportMixin, FastJSONRendererMixin, ValuesListMixin
+from core.serializers import EXPORT_PARAMETERS, SPARSE_FIELDS_PARAMETERS
+from core.pagination import CursorOptInPagination
+
 from .models import Review
 from .permissions import IsReviewAuthorOrReadOnly
-from .serializers import ReviewSerializer
+from .serializers import ReviewSerializer, ReviewValuesSerializer
 
 
 @extend_schema(tags=["Отзывы"])
@@ -15,19 +19,38 @@ from .serializers import ReviewSerializer
     list=extend_schema(
         summary="Получить список отзывов",
         description="Возвращает список отзывов пользователей.",
+        parameters=SPARSE_FIELDS_PARAMETERS,
     ),
     retrieve=extend_schema(
         summary="Получить отзыв по ID",
         description="Позволяет получить отдельный отзыв "
         "по его уникальному идентификатору.",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
+    export=extend_schema(
+        summary="Выгрузка отзывов",
+        description="Потоковая выгрузка всех отзывов, подходящих "
+        "под фильтры списка, в NDJSON или CSV без пагинации.",
+        parameters=EXPORT_PARAMETERS + SPARSE_FIELDS_PARAMETERS,
+        responses={200: None},
     ),
 )
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(
+    FastJSONRendererMixin,
+    ETagMixin,
+    ExportMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Представление для работы с отзывами пользователей."""
 
-    queryset = Review.objects.all()
+    queryset = Review.objects.order_by("created_at", "id")
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    values_serializer_class = ReviewValuesSerializer
+    export_filename = "reviews"
+    pagination_class = CursorOptInPagination
+    cursor_ordering = ("created_at", "id")
+    etag_tables = (Review,)
     permission_classes = [IsReviewAuthorOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["user", "rating"]
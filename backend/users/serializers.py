@@ -4,6 +4,8 @@ from djoser.serializers import UserCreateSerializer
 
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsMixin
+
 from .models import User, UserCoordinates
 
 
@@ -22,7 +24,7 @@ class CoordinatesUserSerializer(serializers.ModelSerializer):
         }
 
 
-class UserSerializer(UserCreateSerializer):
+class UserSerializer(SparseFieldsMixin, UserCreateSerializer):
     """
     Сериализатор для модели пользователя .
     """
@@ -0,0 +1,80 @@
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from cars.tests import create_user
+from core.testing import QueryBudgetMixin
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Координаты пользователей выбираются в том же запросе."""
+
+    LIST_BUDGET = 2
+    DETAIL_BUDGET = 1
+    SET_COORDINATES_BUDGET = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(latitude=55.75, longitude=37.61)
+
+    def add_users(self, count=10):
+        for index in range(count):
+            create_user(
+                email=f"driver{index}@example.com",
+                latitude=55.7 + index * 0.01,
+                longitude=37.6,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_list(self):
+        self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/users/")
+        self.add_users()
+        response = self.assertQueryBudget(self.LIST_BUDGET, "/api/v1/users/")
+        self.assertEqual(response.data["count"], 11)
+
+    def test_detail(self):
+        self.assertQueryBudget(
+            self.DETAIL_BUDGET, f"/api/v1/users/{self.user.id}/"
+        )
+
+    def test_set_coordinates(self):
+        self.assertQueryBudget(
+            self.SET_COORDINATES_BUDGET,
+            f"/api/v1/users/{self.user.id}/set-user-coordinates/",
+            method="post",
+            data={"latitude": 55.76, "longitude": 37.62},
+            format="json",
+        )
+
+
+@override_settings(REQUEST_INSTRUMENTATION=True, SLOW_REQUEST_THRESHOLD_MS=0)
+class SlowRequestLogTests(APITestCase):
+    """В журнал медленных запросов не попадают значения параметров SQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def test_params_are_not_logged(self):
+        with self.assertLogs("core.slow_requests") as logs:
+            response = self.client.post(
+                "/api/v1/users/reset-code/",
+                {"email": self.user.email},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        output = "\n".join(logs.output)
+
+        self.assertIn('"sql"', output)
+        self.assertNotIn('"params"', output)
+
+        for secret in (
+            self.user.email,
+            self.user.password,
+            self.user.password_reset_code,
+        ):
+            self.assertNotIn(secret, output)
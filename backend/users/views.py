@@ -4,11 +4,9 @@ from core.texts import (
     USER_SUCCESS_DELETE_ACCOUNT,
     USER_ERROR_DELETE,
 )
-from core.utils import (
-    generate_reset_code,
-    get_attempts_word,
-    send_confirmation_code,
-)
+from core.jobs import enqueue
+from core.serializers import SPARSE_FIELDS_PARAMETERS, get_sparse_fields
+from core.utils import generate_reset_code, get_attempts_word
 from django.db.transaction import atomic
 from django.shortcuts import get_object_or_404
 
@@ -40,13 +38,22 @@ from .serializers import (
 
 @extend_schema(tags=["Пользователи"])
 @extend_schema_view(
-    list=extend_schema(summary="Список пользователей"),
-    retrieve=extend_schema(summary="Получение профиля одного пользователя"),
+    list=extend_schema(
+        summary="Список пользователей",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
+    retrieve=extend_schema(
+        summary="Получение профиля одного пользователя",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
     create=extend_schema(summary="Создание пользователя"),
     update=extend_schema(summary="Полное обновление пользователя"),
     partial_update=extend_schema(summary="Частичное обновление пользователя"),
     destroy=extend_schema(summary="Удаление пользователя"),
-    me=extend_schema(summary="Данные текущего пользователя"),
+    me=extend_schema(
+        summary="Данные текущего пользователя",
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    ),
     reset_code=extend_schema(summary="Сброс пароля пользователя"),
     set_user_password=extend_schema(
         summary="Изменение пароля пользователя после сброса."
@@ -58,11 +65,20 @@ from .serializers import (
 class PublicUserViewSet(DjoserUserViewSet):
     """Представление для работы с публичными данными пользователей."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.select_related("coordinates")
     serializer_class = UserSerializer
     pagination_class = PageNumberPagination
     permission_classes = [CurrentUserOrAdminOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = get_sparse_fields(self.request, UserSerializer.Meta.fields)
+
+        if "coordinates" not in fields:
+            queryset = queryset.select_related(None)
+
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "me":
             return UserSerializer
@@ -133,7 +149,11 @@ class PublicUserViewSet(DjoserUserViewSet):
         user.password_reset_attempts = 0
         user.save()
 
-        send_confirmation_code(user.email, code)
+        enqueue(
+            "core.utils.send_confirmation_code",
+            email=user.email,
+            code=code,
+        )
 
         return Response(
             {"success": "Код успешно отправлен на почту"},